@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Measure how segmentation and tokenization scale with the number of threads."""
+# This command-line tool segments a text (from the files given as arguments or
+# from STDIN) with split_multi_parallel and tokenizes its sentences with
+# tokenize_parallel, once for each given number of threads, and reports the
+# best time of a few repeats and the speed-up over a single thread.
+#
+# On a Python build with the GIL, the threads only overlap while the regex
+# module has released the GIL, so expect little or no speed-up.
+#
+# Run it with segtok installed, or from the repository root with
+# PYTHONPATH=. python benchmarks/threads.py FILE...
+
+import argparse
+import io
+import sys
+from timeit import default_timer
+
+from segtok.segmenter import split_multi, split_multi_parallel
+from segtok.tokenizer import tokenize_parallel, web_tokenizer, word_tokenizer
+
+
+def best_time(repeats, function):
+    times = []
+
+    for _ in range(repeats):
+        start = default_timer()
+        function()
+        times.append(default_timer() - start)
+
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('files', metavar='FILE', nargs='*', help='input text files (default: STDIN)')
+    parser.add_argument('--threads', metavar='N', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='the thread counts to measure [%(default)s]')
+    parser.add_argument('--repeats', metavar='N', type=int, default=3,
+                        help='the number of runs per measurement (the best one counts) [%(default)s]')
+    parser.add_argument('--chunk-size', metavar='CHARS', type=int, default=1 << 16,
+                        help='the segmentation piece size [%(default)s]')
+    parser.add_argument('--web', action='store_true', help='measure the web_tokenizer')
+    args = parser.parse_args()
+
+    if args.files:
+        text = '\n\n'.join(io.open(path, encoding='utf-8').read() for path in args.files)
+    else:
+        text = sys.stdin.read()
+
+    sentences = [sentence for sentence, _ in split_multi(text)]
+    tokenizer = web_tokenizer if args.web else word_tokenizer
+    print('{:,d} characters, {:,d} sentences, Python {}'.format(
+        len(text), len(sentences), sys.version.split()[0]
+    ))
+    print('{:>8} {:>12} {:>8} {:>12} {:>8}'.format('threads', 'segment s', 'speed-up',
+                                                    'tokenize s', 'speed-up'))
+    base = None
+
+    for threads in args.threads:
+        segment = best_time(args.repeats, lambda: split_multi_parallel(
+            text, chunk_size=args.chunk_size, threads=threads
+        ))
+        tokenize = best_time(args.repeats, lambda: list(tokenize_parallel(sentences, tokenizer, threads)))
+
+        if base is None:
+            base = segment, tokenize
+
+        print('{:>8d} {:>12.3f} {:>8.2f} {:>12.3f} {:>8.2f}'.format(
+            threads, segment, base[0] / segment, tokenize, base[1] / tokenize
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,3 +5,22 @@
 .. moduleauthor:: Florian Leitner <florian.leitner@gmail.com>
 .. License: MIT <http://opensource.org/licenses/MIT>
 """
+from __future__ import absolute_import
+import sys
+
+__all__ = ['Document', 'Sentence']
+
+
+def __getattr__(name):
+    # import the document module (and thereby the segmenter and tokenizer) only when used,
+    # so that ``python -m segtok.segmenter`` does not import the segmenter twice (PEP 562)
+    if name in __all__:
+        from . import document
+        value = globals()[name] = getattr(document, name)
+        return value
+
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+if sys.version_info < (3, 7):  # no module __getattr__
+    from .document import Document, Sentence
@@ -0,0 +1,163 @@
+"""
+Content-addressed caching of sentence segmentation results.
+
+Documents are keyed by a hash of their text together with the segmentation parameters.
+Only the sentence offsets are stored, as a compact integer array, and the sentence texts
+are sliced from the (identical) document again on a cache hit.
+
+The storage backend is pluggable: Any object with a ``get(key)`` method that returns the
+stored bytes (or None) and a ``put(key, value)`` method can be used as a store.
+Two stores are provided, an in-memory LRU store and a SQLite store that can be shared by
+several processes::
+
+    >>> cache = SegmentationCache(MemoryStore(size=1000))
+    >>> cache.split_single("One sentence. And another one.")
+    [('One sentence.', (0, 13)), ('And another one.', (14, 30))]
+"""
+from __future__ import absolute_import, unicode_literals
+from collections import OrderedDict
+import hashlib
+import sqlite3
+from threading import Lock
+
+from .segmenter import split_single, split_multi, SHORT_SENTENCE_LENGTH
+from .span_utils import OFFSET_TYPE, pack_spans, unpack_spans
+
+
+__author__ = 'Florian Leitner <florian.leitner@gmail.com>'
+
+COMMIT_INTERVAL = 256
+"The number of entries a :class:`SqliteStore` collects before it commits them."
+
+
+class MemoryStore(object):
+    """
+    An in-memory store that keeps (at most) the `size` most recently used entries;
+    it can be shared by several threads.
+    """
+
+    def __init__(self, size=1024):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.pop(key, None)
+
+            if value is not None:
+                self._entries[key] = value
+
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+class SqliteStore(object):
+    """
+    An on-disk store in a SQLite database file at `path`.
+
+    SQLite handles the locking, so the same database file can be shared by several processes.
+    New entries are committed every `commit_interval` entries and when the store is closed,
+    so other processes only see them after that (or after an explicit :meth:`commit`).
+    """
+
+    def __init__(self, path, timeout=30.0, commit_interval=COMMIT_INTERVAL):
+        self.path = path
+        self.commit_interval = commit_interval
+        self._pending = 0
+        self._db = sqlite3.connect(path, timeout=timeout)
+        self._db.execute('CREATE TABLE IF NOT EXISTS segments (key TEXT PRIMARY KEY, offsets BLOB)')
+        self._db.commit()
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+
+    def get(self, key):
+        row = self._db.execute('SELECT offsets FROM segments WHERE key = ?', (key,)).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def put(self, key, value):
+        self._db.execute('INSERT OR REPLACE INTO segments (key, offsets) VALUES (?, ?)',
+                         (key, sqlite3.Binary(value)))
+        self._pending += 1
+
+        if self._pending >= self.commit_interval:
+            self.commit()
+
+    def commit(self):
+        """Commit the entries put since the last commit."""
+        self._db.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self._db.close()
+
+
+class SegmentationCache(object):
+    """
+    Wraps :func:`segtok.segmenter.split_single` and :func:`segtok.segmenter.split_multi`
+    with a `store` (by default, a :class:`MemoryStore`) of the sentence offsets per document.
+    The `hits` and `misses` are counted under a lock, so the cache can be shared by threads
+    if its store can.
+    """
+
+    def __init__(self, store=None):
+        self.store = MemoryStore() if store is None else store
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def split_single(self, text, join_on_lowercase=False, short_sentence_length=SHORT_SENTENCE_LENGTH,
+                     language=None):
+        """Cached :func:`segtok.segmenter.split_single` (returns a list)."""
+        return self._split('single', split_single, text, join_on_lowercase, short_sentence_length, language)
+
+    def split_multi(self, text, join_on_lowercase=False, short_sentence_length=SHORT_SENTENCE_LENGTH,
+                    language=None):
+        """Cached :func:`segtok.segmenter.split_multi` (returns a list)."""
+        return self._split('multi', split_multi, text, join_on_lowercase, short_sentence_length, language)
+
+    def _split(self, mode, splitter, text, join_on_lowercase, short_sentence_length, language):
+        key = make_key(text, mode, join_on_lowercase, short_sentence_length, language)
+        offsets = self.store.get(key)
+
+        if offsets is None:
+            with self._lock:
+                self.misses += 1
+
+            sentences = list(splitter(text, join_on_lowercase, short_sentence_length, language=language))
+            self.store.put(key, pack_spans(span for _, span in sentences))
+            return sentences
+
+        with self._lock:
+            self.hits += 1
+
+        return [(text[start:end], (start, end)) for start, end in unpack_spans(offsets)]
+
+
+def make_key(text, mode, join_on_lowercase, short_sentence_length, language=None):
+    """
+    Hash the `text` together with the segmentation `mode` and parameters into a cache key;
+    the `language` is only hashed if given, so the keys of the default patterns stay valid.
+    The offset type of the stored spans is hashed, too, so stores never mix two formats.
+    """
+    if language is not None:
+        mode = '{}/{}'.format(mode, language)
+
+    digest = hashlib.sha1('{}:{}:{:d}:{:d}:'.format(
+        OFFSET_TYPE, mode, bool(join_on_lowercase), short_sentence_length
+    ).encode('ascii'))
+    digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
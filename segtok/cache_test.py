@@ -0,0 +1,106 @@
+# coding=utf-8
+from __future__ import absolute_import, division, unicode_literals
+import os
+import shutil
+import tempfile
+from threading import Thread
+from unittest import TestCase
+from segtok.cache import SegmentationCache, MemoryStore, SqliteStore, make_key
+from segtok.segmenter import split_single, split_multi
+from segtok.span_utils import pack_spans, unpack_spans
+
+TEXT = "This is Mr. Smith.\nAnd this is\na multiline sentence. (Well, sort of.)"
+
+
+class TestMemoryStore(TestCase):
+
+    def test_eviction(self):
+        store = MemoryStore(size=2)
+        store.put('a', b'1')
+        store.put('b', b'2')
+        store.get('a')
+        store.put('c', b'3')
+        self.assertEqual(2, len(store))
+        self.assertEqual(b'1', store.get('a'))
+        self.assertIsNone(store.get('b'))
+
+    def test_threads(self):
+        store = MemoryStore(size=8)
+
+        def work(n):
+            for i in range(1000):
+                store.put((n, i % 16), b'x')
+                store.get((n, (i + 3) % 16))
+
+        threads = [Thread(target=work, args=(n,)) for n in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(8, len(store))
+
+
+class TestSegmentationCache(TestCase):
+
+    def setUp(self):
+        self.cache = SegmentationCache()
+
+    def test_pack_spans(self):
+        spans = [(0, 5), (7, 12)]
+        self.assertEqual(spans, unpack_spans(pack_spans(spans)))
+        self.assertEqual(b'\x00\x00\x00\x00\x05\x00\x00\x00', pack_spans(spans[:1]))
+
+    def test_key_parameters(self):
+        keys = {make_key(TEXT, 'single', False, 55), make_key(TEXT, 'multi', False, 55),
+                make_key(TEXT, 'single', True, 55), make_key(TEXT, 'single', False, 10),
+                make_key(TEXT, 'single', False, 55, 'en')}
+        self.assertEqual(5, len(keys))
+        self.assertEqual(make_key(TEXT, 'single', False, 55), make_key(TEXT, 'single', False, 55, None))
+
+    def test_split_single(self):
+        expected = list(split_single(TEXT))
+        self.assertEqual(expected, self.cache.split_single(TEXT))
+        self.assertEqual(expected, self.cache.split_single(TEXT))
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    def test_split_multi(self):
+        expected = list(split_multi(TEXT))
+        self.assertEqual(expected, self.cache.split_multi(TEXT))
+        self.assertEqual(expected, self.cache.split_multi(TEXT))
+        self.assertNotEqual(expected, self.cache.split_single(TEXT))
+        self.assertEqual((1, 2), (self.cache.hits, self.cache.misses))
+
+
+class TestSqliteStore(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'segments.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shared(self):
+        writer = SqliteStore(self.path)
+        SegmentationCache(writer).split_multi(TEXT)
+        writer.close()
+        reader = SqliteStore(self.path)
+        cache = SegmentationCache(reader)
+        self.assertEqual(list(split_multi(TEXT)), cache.split_multi(TEXT))
+        self.assertEqual(1, cache.hits)
+        reader.close()
+
+    def test_commit_interval(self):
+        writer = SqliteStore(self.path, commit_interval=2)
+        reader = SqliteStore(self.path)
+        writer.put('a', b'1')
+        self.assertEqual(0, len(reader))
+        writer.put('b', b'2')
+        self.assertEqual(2, len(reader))
+        writer.put('c', b'3')
+        writer.close()
+        self.assertEqual(b'3', reader.get('c'))
+        reader.close()
@@ -0,0 +1,551 @@
+"""
+Corpus input for the command-line tools: compressed files, directories and globs.
+
+Files ending in ``.gz``, ``.bz2`` or ``.xz`` are decompressed on the fly with the standard
+library modules (``.xz`` requires Python 3's ``lzma``).
+:func:`read_texts` decompresses and decodes the files in a pool of reader threads, a few files
+ahead of the consumer, so the reading overlaps with the segmentation or tokenization (the
+decompressors release the GIL while working); :func:`read_batches` does the same, but only
+holds a few batches of lines of each file in memory.
+
+:func:`write_shards` and :func:`write_stdin_shards` write the output of a corpus run to one shard
+per input file or per batch of STDIN documents; with a :class:`Manifest` of the finished shards,
+an interrupted run resumes with the first unfinished shard.
+"""
+from __future__ import absolute_import, unicode_literals
+import bz2
+import codecs
+from collections import deque
+import glob
+import gzip
+from itertools import islice
+import json
+import os
+from threading import Event
+
+try:
+    import lzma
+except ImportError:  # Python 2
+    lzma = None
+
+try:
+    from queue import Full, Queue
+except ImportError:  # Python 2
+    from Queue import Full, Queue
+
+
+__author__ = 'Florian Leitner <florian.leitner@gmail.com>'
+
+COMPRESSED = {
+    '.gz': gzip.open,
+    '.bz2': bz2.BZ2File,
+    '.xz': lzma.open if lzma is not None else None,
+}
+"The binary file openers for the supported compressed file name extensions."
+
+READ_AHEAD = 2
+"The number of files each reader thread may read ahead of the consumer."
+
+READ_AHEAD_BATCHES = 16
+"The number of line batches each reader thread may read ahead of the consumer."
+
+SHARD_SIZE = 10000
+"The number of STDIN documents per output shard."
+
+BATCH_SIZE = 1024
+"The number of lines the command-line tools process and write at once."
+
+MANIFEST = '.segtok-manifest'
+"The file name of the manifest of finished shards in an output directory."
+
+PARTIAL = '.partial'
+"The file name extension of a shard that is still being written."
+
+STDIN = '-'
+"The input name of STDIN in the manifest."
+
+
+def open_text(path, encoding='utf-8'):
+    """Open a plain-text or compressed file at `path` for reading text in the `encoding`."""
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension not in COMPRESSED:
+        return codecs.open(path, 'r', encoding=encoding)
+
+    opener = COMPRESSED[extension]
+
+    if opener is None:
+        raise IOError('reading %s files requires the lzma module: %s' % (extension, path))
+
+    return codecs.getreader(encoding)(opener(path, 'rb'))
+
+
+def read_text(path, encoding='utf-8'):
+    """Read the entire (decompressed) text of the file at `path`."""
+    with open_text(path, encoding) as stream:
+        return stream.read()
+
+
+def expand_inputs(paths):
+    """
+    Expand directories (recursively) and glob patterns among the `paths` to the files they contain.
+
+    :return: a list of ``(path, name)`` pairs, where the name is the file path relative to
+             the expanded directory, or the file's base name otherwise
+    """
+    inputs = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+
+                for file_name in sorted(files):
+                    file_path = os.path.join(root, file_name)
+                    inputs.append((file_path, os.path.relpath(file_path, path)))
+        elif not os.path.exists(path) and glob.has_magic(path):
+            inputs.extend((p, os.path.basename(p)) for p in sorted(glob.glob(path)) if os.path.isfile(p))
+        else:
+            inputs.append((path, os.path.basename(path)))
+
+    return inputs
+
+
+def read_texts(paths, encoding='utf-8', readers=1):
+    """
+    Generate the ``(path, text)`` of each file among the `paths`, in order.
+
+    With one or more `readers`, the files are read by as many threads, each at most
+    :data:`READ_AHEAD` files ahead of the consumer; with zero, they are read on demand.
+    """
+    if readers < 1:
+        for path in paths:
+            yield path, read_text(path, encoding)
+
+        return
+
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(readers)
+    pending = deque()
+
+    try:
+        for path in paths:
+            pending.append((path, pool.apply_async(read_text, (path, encoding))))
+
+            if len(pending) >= readers * READ_AHEAD:
+                path, result = pending.popleft()
+                yield path, result.get()
+
+        while pending:
+            path, result = pending.popleft()
+            yield path, result.get()
+    finally:
+        pool.terminate()
+
+
+def read_batches(paths, encoding='utf-8', readers=1, size=BATCH_SIZE):
+    """
+    Generate the ``(path, batches)`` of each file among the `paths`, in order, where the
+    `batches` generate lists of (at most) `size` consecutive lines of the file; any batches
+    of a file the consumer leaves are skipped before the next file is generated.
+
+    With one or more `readers`, the files are read by as many threads, each at most
+    :data:`READ_AHEAD_BATCHES` batches ahead of the consumer; with zero, they are read on demand.
+    """
+    if readers < 1:
+        for path in paths:
+            yield path, _read_batches(path, encoding, size)
+
+        return
+
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(readers)
+    stop = Event()
+    queues = []
+
+    try:
+        for path in paths:
+            queue = Queue(READ_AHEAD_BATCHES)
+            pool.apply_async(_fill, (path, encoding, size, queue, stop))
+            queues.append((path, queue))
+
+        for path, queue in queues:
+            file_batches = _drain(queue)
+            yield path, file_batches
+
+            for _ in file_batches:
+                pass
+    finally:
+        stop.set()
+        pool.terminate()
+
+
+def _read_batches(path, encoding, size):
+    with open_text(path, encoding) as stream:
+        for batch in batches(stream, size):
+            yield batch
+
+
+def _fill(path, encoding, size, queue, stop):
+    # put the batches of the file, and then None (or the error), on the queue until stopped
+    try:
+        for batch in _read_batches(path, encoding, size):
+            if not _put(queue, batch, stop):
+                return
+    except Exception as error:
+        _put(queue, error, stop)
+    else:
+        _put(queue, None, stop)
+
+
+def _put(queue, item, stop):
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=0.1)
+            return True
+        except Full:
+            pass
+
+    return False
+
+
+def _drain(queue):
+    while True:
+        batch = queue.get()
+
+        if batch is None:
+            return
+        elif isinstance(batch, Exception):
+            raise batch
+
+        yield batch
+
+
+def batches(lines, size=BATCH_SIZE):
+    """Generate lists of (at most) `size` consecutive `lines`."""
+    lines = iter(lines)
+    batch = list(islice(lines, size))
+
+    while batch:
+        yield batch
+        batch = list(islice(lines, size))
+
+
+def shard_path(name, output_dir, extension=''):
+    """
+    The output shard path for the input file `name` (see :func:`expand_inputs`)
+    in the `output_dir`, without any compression extension and with the given `extension`.
+    The shard's directory is created if necessary.
+    """
+    root, ext = os.path.splitext(name)
+
+    if ext.lower() in COMPRESSED:
+        name = root
+
+    path = os.path.join(output_dir, name + extension)
+    directory = os.path.dirname(path)
+
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    return path
+
+
+def write_shards(inputs, handle, output_dir, encoding='utf-8', readers=1, manifest=None, progress=None,
+                 batch_size=None, checkpoint_size=SHARD_SIZE):
+    """
+    Process the text of each of the `inputs` (see :func:`expand_inputs`) with
+    ``handle(text, out)`` into its shard in the `output_dir` (see :func:`shard_path`).
+    With a `batch_size`, ``handle(batches, out)`` gets the batches of lines of each file
+    instead (see :func:`read_batches`), so no file is read into memory as a whole; it must
+    write the output of each batch before it takes the next one, and each line counts as
+    one document.
+
+    Each shard is written to a partial file first and only renamed when done, so the output
+    never contains half a shard. With a :class:`Manifest`, finished shards are recorded and
+    the inputs that a previous run finished are skipped. In batch mode, the partial shard is
+    also checkpointed every `checkpoint_size` lines, and an input that was cut off resumes
+    at its last checkpoint.
+    A :class:`segtok.profiling.Progress` instance, if given, tracks the files.
+    :raise ValueError: if a shard would overwrite its input file, or if two input files would
+                       be written to the same shard (e.g., ``a/x.txt`` and ``b/x.txt``);
+                       both are checked before any file is processed
+    """
+    names = dict(inputs)
+    shards = {}
+
+    for path, name in inputs:
+        shard = os.path.abspath(shard_path(name, output_dir))
+        other = shards.setdefault(shard, path)
+
+        if shard == os.path.abspath(path):
+            raise ValueError('output shard would overwrite its input: ' + shard)
+        elif os.path.abspath(other) != os.path.abspath(path):
+            raise ValueError('input files %s and %s would be written to the same shard: %s' % (
+                other, path, shard
+            ))
+
+    paths = [p for p, _ in inputs if manifest is None or not manifest.finished(p)]
+    if batch_size is None:
+        texts = read_texts(paths, encoding, readers)
+    else:
+        texts = read_batches(paths, encoding, readers, batch_size)
+
+    if progress is not None:
+        texts = progress.track(texts)
+
+    for path, text in texts:
+        shard = shard_path(names[path], output_dir)
+
+        if batch_size is None:
+            with codecs.open(shard + PARTIAL, 'w', encoding=encoding) as out:
+                documents = handle(text, out)
+        else:
+            documents = _write_batches(path, text, handle, shard, encoding, manifest, checkpoint_size)
+
+        _replace(shard + PARTIAL, shard)
+
+        if manifest is not None:
+            manifest.add(path, shard, documents, os.path.getsize(path))
+
+
+def _write_batches(path, batches, handle, shard, encoding, manifest, checkpoint_size):
+    # handle the line batches of the input `path` into the partial `shard`, from and with
+    # checkpoints in the manifest (if any), and return the number of lines of the shard
+    checkpoint = None if manifest is None else manifest.checkpoint(path)
+
+    if checkpoint is None:
+        lines, raw = 0, open(shard + PARTIAL, 'wb')
+    else:
+        lines, raw = checkpoint['position'], open(shard + PARTIAL, 'r+b')
+        raw.truncate(checkpoint['offset'])
+        raw.seek(checkpoint['offset'])
+
+    counted = [lines]
+
+    def checkpointed(batches):
+        last = counted[0]
+
+        for batch in batches:
+            yield batch
+            counted[0] += len(batch)
+
+            if manifest is not None and counted[0] - last >= checkpoint_size:
+                out.flush()
+                os.fsync(raw.fileno())
+                manifest.add(path, shard, counted[0], counted[0], raw.tell())
+                last = counted[0]
+
+    with raw:
+        out = codecs.getwriter(encoding)(raw)
+        handle(checkpointed(_skip_lines(batches, lines)), out)
+
+    return counted[0]
+
+
+def _skip_lines(batches, count):
+    for batch in batches:
+        if count < len(batch):
+            yield batch[count:] if count else batch
+            count = 0
+        else:
+            count -= len(batch)
+
+
+def write_stdin_shards(documents, handle, output_dir, encoding='utf-8', shard_size=SHARD_SIZE,
+                       manifest=None, key=None, batch_size=None):
+    """
+    Process the `documents` (e.g., the lines of STDIN) with ``handle(document, out)`` into
+    numbered shards of (at most) `shard_size` documents in the `output_dir`.
+    With a `batch_size`, ``handle(batch, out)`` gets lists of (at most) that many documents
+    instead; a batch never crosses the end of a shard.
+
+    With a :class:`Manifest`, finished shards are recorded, and the documents a previous run
+    finished are skipped: if a `key` function is given, those with a key (e.g., their ID) that
+    is also the key of a line of the finished shards, or else the number of documents the
+    previous run consumed.
+    """
+    number, position = 0, 0
+    skip, done = 0, frozenset()
+    size = 1 if batch_size is None else batch_size
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    if manifest is not None:
+        records = manifest.records(STDIN)
+        number = len(records)
+
+        if key is None:
+            skip = records[-1]['position'] if records else 0
+        else:
+            done = frozenset(manifest.keys(STDIN, encoding, key))
+
+    out = None
+    count = 0
+    batch = []
+
+    for document in documents:
+        position += 1
+
+        if position <= skip or (done and key(document) in done):
+            continue
+
+        batch.append(document)
+
+        if len(batch) < size and count + len(batch) < shard_size:
+            continue
+
+        if out is None:
+            shard, out = _open_shard(output_dir, number, encoding)
+
+        handle(batch[0] if batch_size is None else batch, out)
+        count += len(batch)
+        batch = []
+
+        if count == shard_size:
+            _finish(out, shard, count, position, manifest)
+            out, count, number = None, 0, number + 1
+
+    if batch:
+        if out is None:
+            shard, out = _open_shard(output_dir, number, encoding)
+
+        handle(batch, out)
+        count += len(batch)
+
+    if out is not None:
+        _finish(out, shard, count, position, manifest)
+
+
+def _open_shard(output_dir, number, encoding):
+    shard = os.path.join(output_dir, 'stdin-%05d' % number)
+    return shard, codecs.open(shard + PARTIAL, 'w', encoding=encoding)
+
+
+def _finish(out, shard, documents, position, manifest):
+    out.close()
+    _replace(shard + PARTIAL, shard)
+
+    if manifest is not None:
+        manifest.add(STDIN, shard, documents, position)
+
+
+def _replace(source, target):
+    if os.path.exists(target):
+        os.remove(target)  # os.rename does not replace files on Windows (or os.replace in Py2)
+
+    os.rename(source, target)
+
+
+def write_json(data, path):
+    """Write the `data` to the file at `path` as an (indented) JSON document."""
+    with codecs.open(path, 'w', encoding='utf-8') as stream:
+        stream.write(json.dumps(data, indent=2, sort_keys=True))
+        stream.write('\n')
+
+
+class Manifest(object):
+    """
+    The record of the finished shards of a corpus run in the `output_dir`, one JSON object per
+    line: the ``input`` file path (or ``-`` for STDIN), the ``shard`` path (relative to the
+    `output_dir`), the number of ``documents`` in the shard, and the ``position`` in the input
+    after the shard (the file size in bytes, or the number of consumed STDIN documents).
+    A checkpoint of a partial shard also has the ``offset`` (size in bytes) of the partial
+    shard, and its ``position`` is the number of consumed lines of the input file.
+
+    Records are flushed to disk as they are added, so the manifest survives a killed run.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST)
+        self._records = []
+
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+
+        if os.path.exists(self.path):
+            size = 0
+
+            with open(self.path, 'rb') as stream:
+                for line in stream:
+                    try:
+                        if not line.endswith(b'\n'):
+                            raise ValueError('incomplete record')
+
+                        self._records.append(json.loads(line.decode('utf-8')))
+                    except ValueError:
+                        break  # a record that was cut off when the run was killed
+
+                    size += len(line)
+
+            with open(self.path, 'r+b') as stream:
+                stream.truncate(size)
+
+        self._finished = set(r['input'] for r in self._records if 'offset' not in r)
+        self._stream = open(self.path, 'ab')
+
+    def __len__(self):
+        return len(self._records)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def finished(self, input_path):
+        """True if the shard of the `input_path` was finished by this or a previous run."""
+        return input_path in self._finished
+
+    def checkpoint(self, input_path):
+        """The last checkpoint record of the unfinished shard of the `input_path`, or None."""
+        records = self.records(input_path)
+
+        if records and 'offset' in records[-1]:
+            return records[-1]
+
+        return None
+
+    def records(self, input_path=None):
+        """The list of the records (dictionaries) of all shards, or only those of the `input_path`."""
+        return [r for r in self._records if input_path is None or r['input'] == input_path]
+
+    def keys(self, input_path, encoding='utf-8', key=None):
+        """
+        Generate the keys of the lines of the finished shards: the result of the `key` function,
+        or else the first tab-separated column.
+        """
+        if key is None:
+            key = lambda line: line.split('\t', 1)[0]
+
+        for record in self.records(input_path):
+            shard = os.path.join(self.output_dir, record['shard'])
+
+            with codecs.open(shard, 'r', encoding=encoding) as stream:
+                for line in stream:
+                    yield key(line)
+
+    def add(self, input_path, shard, documents, position, offset=None):
+        """
+        Record a finished `shard` of the `input_path` (or a checkpoint of the partial shard,
+        if its `offset` is given) and flush the record to disk.
+        """
+        record = {'input': input_path, 'shard': os.path.relpath(shard, self.output_dir),
+                  'documents': documents, 'position': position}
+
+        if offset is not None:
+            record['offset'] = offset
+
+        self._stream.write((json.dumps(record, sort_keys=True) + '\n').encode('utf-8'))
+        self._stream.flush()
+        os.fsync(self._stream.fileno())
+        self._records.append(record)
+
+        if offset is None:
+            self._finished.add(input_path)
+
+    def close(self):
+        self._stream.close()
+
@@ -0,0 +1,240 @@
+# coding=utf-8
+from __future__ import absolute_import, division, unicode_literals
+import bz2
+import gzip
+import io
+from itertools import islice
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from segtok.corpus import batches, expand_inputs, lzma, open_text, read_batches, read_texts, shard_path, \
+    write_shards, write_stdin_shards, Manifest
+from segtok.profiling import Progress
+
+TEXT = "This is Mr. Smith.\nAnd this is\na multiline sentence. (Well, sort of.)\n"
+
+
+class TestCorpus(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'sub'))
+        self.files = [self.write('a.txt', open), self.write('b.txt.gz', gzip.open),
+                      self.write(os.path.join('sub', 'c.txt.bz2'), bz2.BZ2File)]
+
+        if lzma is not None:
+            self.files.append(self.write(os.path.join('sub', 'd.txt.xz'), lzma.open))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, opener):
+        path = os.path.join(self.directory, name)
+        stream = opener(path, 'wb')
+        stream.write(TEXT.encode('utf-8'))
+        stream.close()
+        return path
+
+    def test_open_text(self):
+        for path in self.files:
+            with open_text(path) as stream:
+                self.assertEqual(TEXT.splitlines(True), list(stream))
+
+    def test_expand_directory(self):
+        names = ['a.txt', 'b.txt.gz', os.path.join('sub', 'c.txt.bz2'), os.path.join('sub', 'd.txt.xz')]
+        self.assertEqual(list(zip(self.files, names[:len(self.files)])), expand_inputs([self.directory]))
+
+    def test_expand_glob(self):
+        pattern = os.path.join(self.directory, '*.txt*')
+        self.assertEqual([(self.files[0], 'a.txt'), (self.files[1], 'b.txt.gz')], expand_inputs([pattern]))
+
+    def test_read_texts(self):
+        for readers in (0, 1, 3):
+            self.assertEqual([(p, TEXT) for p in self.files], list(read_texts(self.files, readers=readers)))
+
+    def test_read_batches(self):
+        for readers in (0, 1, 3):
+            files = read_batches(self.files + self.files, readers=readers, size=2)
+            read = [(p, [list(b) for b in file_batches]) for p, file_batches in files]
+            self.assertEqual([(p, list(batches(TEXT.splitlines(True), 2))) for p in self.files * 2], read)
+
+        files = read_batches(self.files, readers=1, size=1)
+        self.assertEqual([self.files[0], self.files[1]], [p for p, _ in islice(files, 2)])
+        files.close()
+
+        missing = read_batches([os.path.join(self.directory, 'missing.txt')], readers=1)
+        self.assertRaises(IOError, lambda: [list(b) for _, b in missing])
+
+    def test_shard_path(self):
+        output_dir = os.path.join(self.directory, 'out')
+        path = shard_path(os.path.join('sub', 'c.txt.bz2'), output_dir)
+        self.assertEqual(os.path.join(output_dir, 'sub', 'c.txt'), path)
+        self.assertTrue(os.path.isdir(os.path.join(output_dir, 'sub')))
+
+    def test_write_shards(self):
+        output_dir = os.path.join(self.directory, 'out')
+        inputs = expand_inputs([self.directory])
+        handled = []
+
+        def handle(text, out):
+            handled.append(text)
+            out.write(text.upper())
+            return 1
+
+        with Manifest(output_dir) as manifest:
+            write_shards(inputs[:1], handle, output_dir, manifest=manifest)
+
+        with Manifest(output_dir) as manifest:
+            write_shards(inputs, handle, output_dir, manifest=manifest)
+            self.assertEqual(len(inputs), len(manifest))
+
+        self.assertEqual([TEXT] * len(inputs), handled)
+
+        with open_text(os.path.join(output_dir, 'sub', 'c.txt')) as stream:
+            self.assertEqual(TEXT.upper(), stream.read())
+
+    def test_write_shards_checkpoints(self):
+        output_dir = os.path.join(self.directory, 'out')
+        lines = ['line %d\n' % i for i in range(10)]
+        path = os.path.join(self.directory, 'lines.txt.gz')
+
+        with gzip.open(path, 'wb') as stream:
+            stream.write(''.join(lines).encode('utf-8'))
+
+        handled = []
+        killed = []
+
+        def handle(batches, out):
+            for batch in batches:
+                if len(handled) == 7 and not killed:
+                    killed.append(batch)
+                    raise RuntimeError('killed')
+
+                handled.extend(batch)
+                out.write(''.join(batch).upper())
+
+        with Manifest(output_dir) as manifest:
+            self.assertRaises(RuntimeError, write_shards, expand_inputs([path]), handle, output_dir,
+                              manifest=manifest, batch_size=1, checkpoint_size=3)
+
+        with Manifest(output_dir) as manifest:
+            self.assertEqual({'documents': 6, 'input': path, 'offset': 42, 'position': 6,
+                              'shard': 'lines.txt'}, manifest.checkpoint(path))
+            self.assertFalse(manifest.finished(path))
+            write_shards(expand_inputs([path]), handle, output_dir, manifest=manifest, batch_size=4,
+                         checkpoint_size=3)
+            self.assertTrue(manifest.finished(path))
+            self.assertIsNone(manifest.checkpoint(path))
+            self.assertEqual(10, manifest.records(path)[-1]['documents'])
+
+        self.assertEqual(lines[:7] + lines[6:], handled)
+
+        with io.open(os.path.join(output_dir, 'lines.txt'), encoding='utf-8') as stream:
+            self.assertEqual(''.join(lines).upper(), stream.read())
+
+    def test_write_shards_conflicts(self):
+        output_dir = os.path.join(self.directory, 'out')
+        other = os.path.join(self.directory, 'sub', 'a.txt')
+        shutil.copy(self.files[0], other)
+        handle = lambda text, out: self.fail('no file should be processed')
+
+        for paths in ([self.files[0], other], [self.files[0], os.path.join(self.directory, 'a.txt.gz')],
+                      [self.files[0]]):
+            self.assertRaises(ValueError, write_shards, expand_inputs(paths), handle,
+                              output_dir if len(paths) > 1 else self.directory)
+
+    def test_write_stdin_shards(self):
+        lines = ['%d\tline\n' % i for i in range(5)]
+        by_id = lambda line: line.split('\t', 1)[0]
+
+        for name, rerun, key in (('count', lines, None), ('ids', lines[2:] + lines[:2], by_id)):
+            output_dir = os.path.join(self.directory, name)
+            handled = []
+
+            def handle(line, out):
+                handled.append(line)
+                out.write(line)
+
+            with Manifest(output_dir) as manifest:
+                write_stdin_shards(lines[:3], handle, output_dir, shard_size=2, manifest=manifest, key=key)
+
+            with Manifest(output_dir) as manifest:
+                write_stdin_shards(rerun, handle, output_dir, shard_size=2, manifest=manifest, key=key)
+                self.assertEqual([2, 1, 2], [r['documents'] for r in manifest.records()])
+
+            self.assertEqual(lines, handled, name)
+            self.assertEqual(['stdin-%05d' % i for i in range(3)], sorted(os.listdir(output_dir))[1:])
+
+    def test_write_stdin_shards_keys(self):
+        lines = ['a\t1\tx\n', 'a\t2\ty\n', 'a\t3\tz\n', 'b\t1\tw\n']
+        key = lambda line: '\t'.join(line.split('\t', 2)[:2])
+        handled = []
+
+        def handle(line, out):
+            handled.append(line)
+            out.write(line)
+
+        with Manifest(self.directory) as manifest:
+            write_stdin_shards(lines[:3], handle, self.directory, shard_size=2, manifest=manifest, key=key)
+
+        with Manifest(self.directory) as manifest:
+            self.assertEqual(['a', 'a', 'a'], list(manifest.keys('-')))
+            self.assertEqual(['a\t1', 'a\t2', 'a\t3'], list(manifest.keys('-', key=key)))
+            write_stdin_shards(lines, handle, self.directory, shard_size=2, manifest=manifest, key=key)
+
+        self.assertEqual(lines, handled)
+
+    def test_write_stdin_shards_batches(self):
+        lines = ['%d\n' % i for i in range(7)]
+        handled = []
+
+        def handle(batch, out):
+            handled.append(len(batch))
+            out.write(''.join(batch))
+
+        with Manifest(self.directory) as manifest:
+            write_stdin_shards(lines, handle, self.directory, shard_size=3, manifest=manifest, batch_size=2)
+            self.assertEqual([3, 3, 1], [r['documents'] for r in manifest.records()])
+            self.assertEqual([3, 6, 7], [r['position'] for r in manifest.records()])
+
+        self.assertEqual([2, 1, 2, 1, 1], handled)
+
+        with io.open(os.path.join(self.directory, 'stdin-00001'), encoding='utf-8') as stream:
+            self.assertEqual('3\n4\n5\n', stream.read())
+
+    def test_batches(self):
+        self.assertEqual([[0, 1], [2, 3], [4]], list(batches(range(5), 2)))
+        self.assertEqual([], list(batches([], 2)))
+
+    def test_manifest_cut_off(self):
+        with Manifest(self.directory) as manifest:
+            manifest.add('a.txt', os.path.join(self.directory, 'a.txt'), 1, 10)
+
+        with open(manifest.path, 'ab') as stream:
+            stream.write(b'{"input": "b.t')
+
+        with Manifest(self.directory) as manifest:
+            self.assertTrue(manifest.finished('a.txt'))
+            self.assertFalse(manifest.finished('b.txt'))
+            manifest.add('b.txt', os.path.join(self.directory, 'b.txt'), 1, 10)
+
+        self.assertEqual(['a.txt', 'b.txt'], [r['input'] for r in Manifest(self.directory).records()])
+
+    def test_progress(self):
+        def handle(text, out):
+            start = progress.clock()
+            out.write(text)
+            lines = text.splitlines()
+            progress.add(len(text), len(lines), start=start)
+            return 1
+
+        inputs = expand_inputs(self.files)
+        progress = Progress(total=sum(os.path.getsize(p) for p, _ in inputs), timed=True, sample=1)
+        write_shards(inputs, handle, os.path.join(self.directory, 'out'), progress=progress)
+        summary = progress.summary()
+        self.assertEqual((len(inputs), 3 * len(inputs), len(TEXT) * len(inputs)),
+                         (summary['documents'], summary['sentences'], summary['chars']))
+        self.assertEqual([p for p, _ in inputs], [f['input'] for f in summary['files']])
+        self.assertEqual(os.path.getsize(self.files[1]), summary['files'][1]['bytes'])
+        self.assertEqual(set(p + ':1' for p in self.files), set(d['id'] for d in summary['slowest']))
@@ -0,0 +1,176 @@
+"""
+A lazily segmented and tokenized document.
+
+A :class:`Document` segments its text on first access to its sentences and keeps only the
+sentence offsets; each :class:`Sentence` is tokenized on first access to its tokens, and
+those tokens are kept, with document-absolute spans, as a :class:`segtok.tokens.TokenArray`.
+Therefore, several pipeline stages can share a document at the cost of a single segmentation,
+and sentences that are never looked at are never tokenized::
+
+    >>> doc = Document("This is Mr. Smith. He is here.")
+    >>> len(doc), doc.sentence(1).text
+    (2, 'He is here.')
+    >>> list(doc.sentence(1).tokens)
+    [('He', (19, 21)), ('is', (22, 24)), ('here', (25, 29)), ('.', (29, 30))]
+"""
+from __future__ import absolute_import, unicode_literals
+from array import array
+
+from .segmenter import split_multi, SHORT_SENTENCE_LENGTH
+from .tokenizer import word_tokenizer
+from .tokens import OFFSET_TYPE, TokenArray
+
+
+__author__ = 'Florian Leitner <florian.leitner@gmail.com>'
+
+
+class Document(object):
+    """
+    A `text` that is segmented with the `segmenter` (a ``split_...`` function) and whose
+    sentences are tokenized with the `tokenizer` (a ``..._tokenizer`` function), both on demand.
+
+    The segmenter has to return sentences that are slices of the text at their spans,
+    as the segtok segmenters do; if a `language` is given, it is passed on to the segmenter
+    (see :data:`segtok.segmenter.LANGUAGES`).
+    """
+
+    __slots__ = ('text', 'segmenter', 'tokenizer', 'join_on_lowercase', 'short_sentence_length',
+                 'language', '_offsets', '_tokens')
+
+    def __init__(self, text, segmenter=split_multi, tokenizer=word_tokenizer, join_on_lowercase=False,
+                 short_sentence_length=SHORT_SENTENCE_LENGTH, language=None):
+        self.text = text
+        self.segmenter = segmenter
+        self.tokenizer = tokenizer
+        self.join_on_lowercase = join_on_lowercase
+        self.short_sentence_length = short_sentence_length
+        self.language = language
+        self._offsets = None
+        self._tokens = {}
+
+    def __len__(self):
+        return len(self.offsets) // 2
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield Sentence(self, idx)
+
+    def __repr__(self):
+        return 'Document(%r)' % self.text
+
+    @property
+    def offsets(self):
+        """
+        The start and end offsets of all sentences, interleaved in one array;
+        the text is segmented on first access.
+        """
+        if self._offsets is None:
+            offsets = array(OFFSET_TYPE)
+            options = {} if self.language is None else {'language': self.language}
+
+            for sentence, (start, end) in self.segmenter(self.text, self.join_on_lowercase,
+                                                         self.short_sentence_length, **options):
+                if sentence:
+                    offsets.append(start)
+                    offsets.append(end)
+
+            self._offsets = offsets
+
+        return self._offsets
+
+    @property
+    def sentences(self):
+        """A list of all (non-empty) :class:`Sentence` views of the document."""
+        return list(self)
+
+    def sentence(self, idx):
+        """The :class:`Sentence` at index `idx` (raises an IndexError if there is none)."""
+        return Sentence(self, self._index(idx))
+
+    def tokens(self, idx):
+        """
+        The tokens of the sentence at index `idx` (raises an IndexError if there is none);
+        the sentence is tokenized on first access.
+        """
+        idx = self._index(idx)
+        tokens = self._tokens.get(idx)
+
+        if tokens is None:
+            start, end = self.offsets[2 * idx], self.offsets[2 * idx + 1]
+            tokens = TokenArray.from_tokens(self.text, (
+                (token, (token_start + start, token_end + start))
+                for token, (token_start, token_end) in self.tokenizer(self.text[start:end])
+            ))
+            self._tokens[idx] = tokens
+
+        return tokens
+
+    def clear_tokens(self, idx=None):
+        """Free the cached tokens of the sentence at index `idx`, or of all sentences."""
+        if idx is None:
+            self._tokens.clear()
+        else:
+            self._tokens.pop(self._index(idx), None)
+
+    def _index(self, idx):
+        """The non-negative sentence index for `idx` (raises an IndexError if out of range)."""
+        count = len(self)
+
+        if idx < 0:
+            idx += count
+
+        if not 0 <= idx < count:
+            raise IndexError('sentence index out of range')
+
+        return idx
+
+    def clear(self):
+        """Free all cached sentence offsets and tokens; the text will be segmented again."""
+        self._offsets = None
+        self._tokens.clear()
+
+
+class Sentence(object):
+    """A view of the sentence at index `idx` of a :class:`Document`."""
+
+    __slots__ = ('document', 'idx')
+
+    def __init__(self, document, idx):
+        self.document = document
+        self.idx = idx
+
+    def __repr__(self):
+        return 'Sentence(%r, %r)' % (self.text, self.span)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sentence):
+            return NotImplemented
+
+        return self.document is other.document and self.idx == other.idx
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash((id(self.document), self.idx))
+
+    @property
+    def span(self):
+        """The ``(start, end)`` offsets of the sentence in the document."""
+        offsets = self.document.offsets
+        return offsets[2 * self.idx], offsets[2 * self.idx + 1]
+
+    @property
+    def text(self):
+        """The sentence text (sliced from the document)."""
+        start, end = self.span
+        return self.document.text[start:end]
+
+    @property
+    def tokens(self):
+        """
+        The tokens of the sentence with document-absolute spans, as a
+        :class:`segtok.tokens.TokenArray`; tokenized on first access and cached by the document.
+        """
+        return self.document.tokens(self.idx)
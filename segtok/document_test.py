@@ -0,0 +1,79 @@
+# coding=utf-8
+from __future__ import absolute_import, division, unicode_literals
+import subprocess
+import sys
+from unittest import TestCase
+from segtok import Document
+from segtok.segmenter import split_multi, split_single
+from segtok.tokenizer import web_tokenizer, word_tokenizer
+
+TEXT = "This is Mr. Smith.\nAnd this is\na multiline sentence. (Well, caf&eacute; of sorts.)"
+
+
+class TestDocument(TestCase):
+
+    def test_sentences(self):
+        doc = Document(TEXT)
+        self.assertEqual(list(split_multi(TEXT)), [(s.text, s.span) for s in doc.sentences])
+        self.assertEqual(3, len(doc))
+        self.assertEqual(doc.sentence(2), doc.sentence(-1))
+        self.assertRaises(IndexError, doc.sentence, 3)
+
+    def test_segmenter(self):
+        doc = Document(TEXT, segmenter=split_single)
+        self.assertEqual(split_single(TEXT), [(s.text, s.span) for s in doc])
+        self.assertEqual(0, len(Document("")))
+
+    def test_language(self):
+        text = "Es ist ein Hund. und eine Katze."
+        self.assertEqual(2, len(Document(text)))
+        self.assertEqual(1, len(Document(text, language='de')))
+
+    def test_tokens(self):
+        doc = Document(TEXT, tokenizer=web_tokenizer)
+        sentence = doc.sentence(2)
+        start = sentence.span[0]
+        expected = [(t, (s + start, e + start)) for t, (s, e) in web_tokenizer(sentence.text)]
+        self.assertEqual(expected, list(sentence.tokens))
+        self.assertEqual(('café', (60, 71)), sentence.tokens[3])
+        self.assertEqual('of', TEXT[slice(*sentence.tokens[4][1])])
+        self.assertIs(sentence.tokens, doc.sentence(2).tokens)
+
+    def test_tokens_index(self):
+        doc = Document(TEXT)
+        last = len(doc) - 1
+        self.assertIs(doc.tokens(last), doc.tokens(-1))
+        self.assertEqual([last], list(doc._tokens))
+        doc.clear_tokens(-1)
+        self.assertEqual({}, doc._tokens)
+        self.assertRaises(IndexError, doc.tokens, last + 1)
+        self.assertRaises(IndexError, doc.tokens, -last - 2)
+
+    def test_lazy(self):
+        calls = []
+
+        def tokenizer(sentence):
+            calls.append(sentence)
+            return word_tokenizer(sentence)
+
+        doc = Document(TEXT, tokenizer=tokenizer)
+        doc.sentence(1).tokens
+        doc.sentence(1).tokens
+        self.assertEqual(["And this is\na multiline sentence."], calls)
+
+    def test_clear(self):
+        doc = Document(TEXT)
+        tokens = doc.sentence(0).tokens
+        doc.clear_tokens(0)
+        self.assertIsNot(tokens, doc.sentence(0).tokens)
+        self.assertEqual(tokens, doc.sentence(0).tokens)
+        doc.clear()
+        self.assertIsNone(doc._offsets)
+        self.assertEqual("This is Mr. Smith.", doc.sentence(0).text)
+
+    def test_lazy_export(self):
+        if sys.version_info < (3, 7):
+            self.skipTest('module __getattr__ requires Python 3.7')
+
+        code = "import sys, segtok; sys.exit('segtok.segmenter' in sys.modules)"
+        self.assertEqual(0, subprocess.call([sys.executable, '-c', code]))
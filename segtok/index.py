@@ -0,0 +1,182 @@
+"""
+A binary sidecar index of sentence offsets for random access to segmented documents.
+
+The :class:`IndexWriter` stores the sentence spans of a sequence of documents in one file,
+and the :class:`SentenceIndex` memory-maps that file, so opening it takes no time, and looks up
+the span of sentence N of document D in constant time or the sentence that contains a
+character offset of document D by bisection::
+
+    >>> path = os.path.join(tempfile.mkdtemp(), 'corpus.idx')
+    >>> with IndexWriter(path) as writer:
+    ...     writer.add(span for _, span in split_multi("One sentence. And another one."))
+    >>> with SentenceIndex(path) as index:
+    ...     index.span(0, 1), index.find(0, 20)
+    ((14, 30), 1)
+
+File layout (in native byte order, which is recorded in the header)::
+
+    header    8-byte magic, byte order mark (``<`` or ``>``), 3 padding bytes, uint32 version
+    records   per sentence: uint32 start offset, uint32 length (end minus start)
+    documents uint64 number of the first sentence of each document, plus the total
+    trailer   uint64 number of documents
+
+The starts are stored as absolute offsets into their document (so they can be bisected
+directly), while the ends are delta-encoded as lengths.
+"""
+from __future__ import absolute_import, unicode_literals
+from array import array
+from bisect import bisect_right
+import mmap
+import struct
+import sys
+
+
+__author__ = 'Florian Leitner <florian.leitner@gmail.com>'
+
+MAGIC = b'SEGTOKIX'
+"The first bytes of an index file."
+
+VERSION = 1
+"The version of the index file format."
+
+HEADER = struct.Struct('=8sc3xI')
+"The layout of the header: magic, byte order mark, version."
+
+RECORD_TYPE = 'I'
+"The integer (array) type of the sentence starts and lengths."
+
+DOCUMENT_TYPE = 'Q'
+"The integer (struct) type of the document table and trailer."
+
+BYTE_ORDER = b'<' if sys.byteorder == 'little' else b'>'
+
+
+class IndexWriter(object):
+    """Write the sentence spans of the documents, one document at a time, to an index at `path`."""
+
+    def __init__(self, path):
+        self._stream = open(path, 'wb')
+        self._stream.write(HEADER.pack(MAGIC, BYTE_ORDER, VERSION))
+        self._firsts = [0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._firsts) - 1
+
+    def add(self, spans):
+        """Append the next document, given by its ``(start, end)`` sentence spans in order."""
+        records = array(RECORD_TYPE)
+
+        for start, end in spans:
+            records.append(start)
+            records.append(end - start)
+
+        records.tofile(self._stream)
+        self._firsts.append(self._firsts[-1] + len(records) // 2)
+
+    def close(self):
+        """Write the document table and close the file."""
+        if not self._stream.closed:
+            fmt = '=%d%s' % (len(self._firsts) + 1, DOCUMENT_TYPE)
+            self._stream.write(struct.pack(fmt, *(self._firsts + [len(self)])))
+            self._stream.close()
+
+
+class SentenceIndex(object):
+    """
+    A memory-mapped, read-only view of an index file at `path`.
+
+    Documents and their sentences are numbered from zero.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as stream:
+            self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._views = []
+        magic, byte_order, version = HEADER.unpack_from(self._mmap, 0)
+
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError('not a version %d segtok index: %s' % (VERSION, path))
+        elif byte_order != BYTE_ORDER:
+            self.close()
+            raise ValueError('index was written with the opposite byte order: ' + path)
+
+        qsize = struct.calcsize('=' + DOCUMENT_TYPE)
+        documents, = struct.unpack_from('=' + DOCUMENT_TYPE, self._mmap, len(self._mmap) - qsize)
+        table = len(self._mmap) - (documents + 2) * qsize
+        self._firsts = self._view(DOCUMENT_TYPE, table, documents + 1)
+        records = self._view(RECORD_TYPE, HEADER.size, 2 * self._firsts[documents])
+        self._starts = self._keep(records[0::2])
+        self._lengths = self._keep(records[1::2])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._firsts) - 1
+
+    def count(self, doc):
+        """The number of sentences in document number `doc`."""
+        return self._firsts[doc + 1] - self._firsts[doc]
+
+    def span(self, doc, sentence):
+        """The ``(start, end)`` offsets of `sentence` number in document number `doc`."""
+        if not 0 <= sentence < self.count(doc):
+            raise IndexError('document %d has no sentence %d' % (doc, sentence))
+
+        i = self._firsts[doc] + sentence
+        return self._starts[i], self._starts[i] + self._lengths[i]
+
+    def spans(self, doc):
+        """All sentence spans of document number `doc`."""
+        starts, lengths = self._starts, self._lengths
+        return [(starts[i], starts[i] + lengths[i])
+                for i in range(self._firsts[doc], self._firsts[doc + 1])]
+
+    def find(self, doc, offset):
+        """
+        The number of the sentence in document number `doc` that contains the character `offset`,
+        or None if the offset is outside of all sentences.
+        """
+        lo, hi = self._firsts[doc], self._firsts[doc + 1]
+        i = bisect_right(self._starts, offset, lo, hi) - 1
+
+        if i >= lo and offset < self._starts[i] + self._lengths[i]:
+            return i - lo
+
+        return None
+
+    def close(self):
+        """Release the memory map."""
+        for view in reversed(self._views):
+            view.release()
+
+        self._views = []
+        self._mmap.close()
+
+    def _view(self, typecode, offset, length):
+        """A sequence of `length` integers of the `typecode` at the `offset` of the memory map."""
+        if not hasattr(memoryview, 'cast'):  # Python 2: no typed memory views
+            return struct.unpack_from('=%d%s' % (length, typecode), self._mmap, offset)
+
+        raw = self._keep(memoryview(self._mmap))
+        size = struct.calcsize('=' + typecode)
+        return self._keep(self._keep(raw[offset:offset + length * size]).cast(typecode))
+
+    def _keep(self, view):
+        """Register a memory `view` to release it on :meth:`close`."""
+        if isinstance(view, memoryview):
+            self._views.append(view)
+
+        return view
+
@@ -0,0 +1,53 @@
+# coding=utf-8
+from __future__ import absolute_import, division, unicode_literals
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from segtok.index import IndexWriter, SentenceIndex
+from segtok.segmenter import split_multi
+
+TEXTS = ["This is Mr. Smith.\nAnd this is\na multiline sentence. (Well, sort of.)", "", "One. Two. Three."]
+
+
+class TestSentenceIndex(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'sentences.idx')
+        self.spans = [[span for s, span in split_multi(text) if s] for text in TEXTS]
+
+        with IndexWriter(self.path) as writer:
+            for spans in self.spans:
+                writer.add(spans)
+
+        self.index = SentenceIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def test_spans(self):
+        self.assertEqual(len(TEXTS), len(self.index))
+        self.assertEqual(self.spans, [self.index.spans(d) for d in range(len(TEXTS))])
+
+    def test_span(self):
+        self.assertEqual((5, 9), self.index.span(2, 1))
+        self.assertEqual(0, self.index.count(1))
+        self.assertRaises(IndexError, self.index.span, 1, 0)
+
+    def test_find(self):
+        self.assertEqual(0, self.index.find(2, 0))
+        self.assertEqual(1, self.index.find(2, 8))
+        self.assertIsNone(self.index.find(2, 4))
+        self.assertEqual(2, self.index.find(2, 15))
+        self.assertIsNone(self.index.find(2, 16))
+        self.assertIsNone(self.index.find(1, 0))
+
+    def test_not_an_index(self):
+        path = os.path.join(self.directory, 'other.idx')
+
+        with open(path, 'wb') as stream:
+            stream.write(b'0' * 32)
+
+        self.assertRaises(ValueError, SentenceIndex, path)
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Offset-preserving text normalization.
+
+Segmentation assumes Unix linebreaks, and tokenization assumes that full- and half-width
+character variants have been normalized. Both change the text's offsets, so :func:`normalize`
+returns the normalized text together with an :class:`OffsetMap` that maps sentence and token
+spans in the normalized text back to the original text::
+
+    >>> text, offsets = normalize("One.\\r\\nTwo\\uFF01")
+    >>> [offsets.span(span) for _, span in split_single(text)]
+    [(0, 4), (6, 10)]
+"""
+from __future__ import absolute_import, unicode_literals
+from array import array
+from bisect import bisect_right
+import unicodedata
+try:
+    from html import unescape
+except ImportError:
+    # Python <= 3.3 doesn't have html.unescape
+    try:
+        from html.parser import HTMLParser
+    except ImportError:
+        # Python 2.x
+        from HTMLParser import HTMLParser
+    unescape = HTMLParser().unescape
+
+from regex import compile, UNICODE
+
+
+__author__ = 'Florian Leitner <florian.leitner@gmail.com>'
+
+LINEBREAKS = r'\r\n|\r|\u2028'
+"All linebreak sequence variants except the Unix newline."
+
+WIDTH_VARIANTS = r'[\u3000\uFF01-\uFFEE]+'
+"Runs of the ideographic space and the full- and half-width character variants."
+
+NORMALIZATIONS = compile(r'(%s)|(%s)' % (LINEBREAKS, WIDTH_VARIANTS), UNICODE)
+"The two groups match linebreaks and width variants to normalize, respectively."
+
+ENTITY = compile(r'&(?:#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?)')
+"HTML character references, as (leniently) matched by :func:`html.unescape`."
+
+
+class OffsetMap(object):
+    """
+    Maps positions in a normalized text back to the original text.
+
+    Only the blocks where the normalization changed the text's length are stored, as four
+    parallel integer arrays of the blocks' normalized and original start and end offsets.
+    Outside those blocks, positions are shifted by the length difference of the preceding block.
+    """
+
+    __slots__ = ('norm_starts', 'norm_ends', 'orig_starts', 'orig_ends')
+
+    def __init__(self):
+        self.norm_starts = array('l')
+        self.norm_ends = array('l')
+        self.orig_starts = array('l')
+        self.orig_ends = array('l')
+
+    def __len__(self):
+        return len(self.norm_starts)
+
+    def add(self, norm_start, norm_end, orig_start, orig_end):
+        """Append a block of the normalized text that replaced a block of different length."""
+        self.norm_starts.append(norm_start)
+        self.norm_ends.append(norm_end)
+        self.orig_starts.append(orig_start)
+        self.orig_ends.append(orig_end)
+
+    def position(self, pos, end=False):
+        """
+        Map a normalized text `pos`ition to the original text.
+
+        Positions inside a replaced block map to the block's original start, or to its
+        original end if the position is the `end` of a span.
+        """
+        return self._position(bisect_right(self.norm_starts, pos) - 1, pos, end)
+
+    def span(self, span):
+        """Map a ``(start, end)`` span in the normalized text to the original text."""
+        return self.position(span[0]), self.position(span[1], True)
+
+    def spans(self, items_with_spans):
+        """
+        Map the spans of a sequence of ``(item, (start, end))`` pairs to the original text.
+
+        The blocks are looked up with a cursor that moves forward with the spans,
+        so a sorted sequence is mapped in a single pass.
+        """
+        starts = self.norm_starts
+        last = len(starts) - 1
+        idx = -1
+
+        for item, (start, end) in items_with_spans:
+            if idx >= 0 and start < starts[idx]:
+                idx = bisect_right(starts, start) - 1
+
+            while idx < last and starts[idx + 1] <= start:
+                idx += 1
+
+            end_idx = idx
+
+            while end_idx < last and starts[end_idx + 1] < end:
+                end_idx += 1
+
+            yield item, (self._position(idx, start, False), self._position(end_idx, end, True))
+
+    def _position(self, idx, pos, end):
+        if idx < 0:
+            return pos
+        elif pos >= self.norm_ends[idx]:
+            return pos + self.orig_ends[idx] - self.norm_ends[idx]
+        elif pos == self.norm_starts[idx] or not end:
+            return self.orig_starts[idx]
+        else:
+            return self.orig_ends[idx]
+
+
+def normalize(text, linebreaks=True, widths=True):
+    """
+    Normalize the `text` and return it together with an :class:`OffsetMap` to the original text.
+
+    :param text: the text to normalize
+    :param linebreaks: replace Windows, Mac, and Unicode linebreaks with newlines (``\\n``)
+    :param widths: NFKC-normalize the full- and half-width character variants
+                   (and the ideographic space), character by character (see :func:`_widths`)
+    :return: a ``(normalized_text, offset_map)`` tuple
+    """
+    offsets = OffsetMap()
+    pieces = []
+    last = 0
+    shift = 0  # normalized minus original length so far
+
+    for match in NORMALIZATIONS.finditer(text):
+        if match.group(1):
+            if not linebreaks:
+                continue
+
+            replacements = [(match.start(), match.end(), '\n')]
+        elif widths:
+            replacements = _widths(match.group(2), match.start())
+        else:
+            continue
+
+        for start, end, replacement in replacements:
+            pieces.append(text[last:start])
+            pieces.append(replacement)
+
+            if len(replacement) != end - start:
+                offsets.add(start + shift, start + shift + len(replacement), start, end)
+                shift += len(replacement) - (end - start)
+
+            last = end
+
+    pieces.append(text[last:])
+    return ''.join(pieces), offsets
+
+
+def _widths(run, offset):
+    """
+    NFKC-normalize a `run` of width variants at `offset` one cluster at a time: a character and
+    the (half-width) combining marks that follow it, like the voiced sound mark in "ｶﾞ".
+    Therefore, only the clusters that change their length become blocks of the offset map.
+
+    :return: a list of ``(start, end, replacement)`` tuples
+    """
+    replacements = []
+    start = 0
+
+    for end in range(1, len(run) + 1):
+        if end == len(run) or not unicodedata.combining(unicodedata.normalize('NFKC', run[end])[0]):
+            replacement = unicodedata.normalize('NFKC', run[start:end])
+            replacements.append((offset + start, offset + end, replacement))
+            start = end
+
+    return replacements
+
+
+def unescape_entities(text):
+    """
+    Decode the HTML character references (named and numeric entities) in the `text` and return
+    it together with an :class:`OffsetMap` to the original text.
+
+    The references are decoded exactly like :func:`html.unescape` does.
+    Any part of a reference that is kept as is (the rest of a named reference without a
+    semicolon, like "&ampfoo") is mapped to the original text one by one.
+
+    :param text: the text to decode
+    :return: a ``(decoded_text, offset_map)`` tuple
+    """
+    offsets = OffsetMap()
+
+    if '&' not in text:
+        return text, offsets
+
+    pieces = []
+    last = 0
+    shift = 0  # decoded minus original length so far
+
+    for match in ENTITY.finditer(text):
+        start, end = match.span()
+        reference = match.group()
+        replacement = unescape(reference)
+
+        if replacement == reference:
+            continue
+
+        while len(replacement) > 1 and replacement[-1] == text[end - 1]:
+            replacement = replacement[:-1]
+            end -= 1
+
+        pieces.append(text[last:start])
+        pieces.append(replacement)
+
+        if len(replacement) != end - start:
+            offsets.add(start + shift, start + shift + len(replacement), start, end)
+            shift += len(replacement) - (end - start)
+
+        last = end
+
+    pieces.append(text[last:])
+    return ''.join(pieces), offsets
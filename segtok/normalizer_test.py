@@ -0,0 +1,65 @@
+# coding=utf-8
+from __future__ import absolute_import, division, unicode_literals
+from unittest import TestCase
+from segtok.normalizer import normalize, unescape, unescape_entities, OffsetMap
+from segtok.segmenter import split_single, to_unix_linebreaks
+from segtok.tokenizer import word_tokenizer
+
+
+class TestNormalize(TestCase):
+
+    def test_linebreaks(self):
+        text = "One.\r\nTwo.\rThree. Four."
+        normal, offsets = normalize(text)
+        self.assertEqual(to_unix_linebreaks(text), normal)
+        self.assertEqual(2, len(normalize(text + "\r\n")[1]))
+        spans = [span for _, span in offsets.spans(split_single(normal))]
+        self.assertEqual(["One.", "Two.", "Three.", "Four."], [text[s:e] for s, e in spans])
+
+    def test_widths(self):
+        text = "Ｈｅｌｌｏ，　ｗｏｒｌｄ！ ｶﾞ"
+        normal, offsets = normalize(text)
+        self.assertEqual("Hello, world! ガ", normal)
+        self.assertEqual(1, len(offsets))
+        tokens = list(offsets.spans(word_tokenizer(normal)))
+        self.assertEqual(["Ｈｅｌｌｏ", "，", "ｗｏｒｌｄ", "！", "ｶﾞ"], [text[s:e] for _, (s, e) in tokens])
+
+    def test_widths_in_run(self):
+        text = "ＡＢＣ ｶﾞ，ＤＥＦ ﾊﾟﾝ"
+        normal, offsets = normalize(text)
+        self.assertEqual("ABC ガ,DEF パン", normal)
+        self.assertEqual(2, len(offsets))
+        tokens = list(offsets.spans(word_tokenizer(normal)))
+        self.assertEqual(["ＡＢＣ", "ｶﾞ", "，", "ＤＥＦ", "ﾊﾟﾝ"], [text[s:e] for _, (s, e) in tokens])
+
+    def test_flags(self):
+        text = "Ｈｉ\r\n"
+        self.assertEqual("Ｈｉ\n", normalize(text, widths=False)[0])
+        self.assertEqual("Hi\r\n", normalize(text, linebreaks=False)[0])
+        self.assertEqual(text, normalize(text, False, False)[0])
+
+    def test_position(self):
+        offsets = OffsetMap()
+        offsets.add(2, 3, 2, 4)  # a "\r\n" at 2
+        offsets.add(5, 7, 6, 7)  # an expansion of one char into two at 6
+        self.assertEqual([0, 1, 2, 4, 5, 6, 6, 7], [offsets.position(p) for p in range(8)])
+        self.assertEqual(7, offsets.position(6, end=True))
+        self.assertEqual((4, 7), offsets.span((3, 6)))
+        self.assertEqual([('x', (6, 7)), ('y', (0, 4))], list(offsets.spans([('x', (5, 6)), ('y', (0, 3))])))
+
+
+class TestUnescapeEntities(TestCase):
+
+    def test_unescape(self):
+        text = "Tom &amp; Jerry&#8217;s &lt;3 &ampfoo &#x26;amp; &bogus; &"
+        decoded, offsets = unescape_entities(text)
+        self.assertEqual(unescape(text), decoded)
+        self.assertEqual(5, len(offsets))
+        spans = [offsets.span(span) for _, span in word_tokenizer(decoded)]
+        self.assertEqual(["Tom", "&amp;", "Jerry&#8217;s", "&lt;", "3", "&amp", "foo", "&#x26;", "amp",
+                          ";", "&", "bogus", ";", "&"], [text[s:e] for s, e in spans])
+
+    def test_unchanged(self):
+        text = "No entities & no changes."
+        self.assertEqual(text, unescape_entities(text)[0])
+        self.assertEqual(0, len(unescape_entities(text)[1]))
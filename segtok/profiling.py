@@ -0,0 +1,248 @@
+"""
+Opt-in instrumentation for the segmenter and tokenizer.
+
+Pass a :class:`Stats` instance as the ``stats`` argument to the segmentation or tokenization
+functions to count which rules fire and to time each pattern check.
+Without it (the default), the functions use the plain compiled patterns and only pay for a
+few ``stats is None`` tests per call.
+A :class:`Stats` instance may be shared by several threads.
+
+A :class:`Progress` instance tracks the throughput of a corpus run in the command-line tools.
+"""
+from __future__ import absolute_import, unicode_literals
+from collections import defaultdict
+import heapq
+import logging
+import os
+from threading import Lock
+from timeit import default_timer
+
+
+__author__ = 'Florian Leitner <florian.leitner@gmail.com>'
+
+LOGGER = logging.getLogger('segtok')
+"The logger that reports exceeded time budgets."
+
+PROGRESS_INTERVAL = 10.0
+"The (minimum) number of seconds between two progress reports."
+
+PROGRESS_SAMPLE = 64
+"The number of documents between two looks at the clock for a progress report."
+
+SLOWEST = 10
+"The number of slowest documents a :class:`Progress` keeps."
+
+
+class Stats(object):
+    """Counts of the rules/paths that fired and accumulated timings of the checks that ran."""
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.calls = defaultdict(int)
+        self.times = defaultdict(float)
+        self._lock = Lock()
+
+    def count(self, name, n=1):
+        """Record that the rule or path `name` fired (`n` times)."""
+        with self._lock:
+            self.counts[name] += n
+
+    def add_time(self, name, seconds):
+        """Record one call of the check or phase `name` that took `seconds`."""
+        with self._lock:
+            self.calls[name] += 1
+            self.times[name] += seconds
+
+    def lap(self, name, start):
+        """Record one call of the phase `name` that started at `start`; return the current time."""
+        now = default_timer()
+        self.add_time(name, now - start)
+        return now
+
+    def timed(self, name, pattern):
+        """Wrap a compiled `pattern` so its ``match`` and ``search`` calls are timed as `name`."""
+        return TimedPattern(self, name, pattern)
+
+    def summary(self):
+        """A plain-text table of the rule counts and check timings."""
+        lines = ['{:<30} {:>12}'.format('rule/path', 'fired')]
+        lines.extend('{:<30} {:>12d}'.format(name, self.counts[name]) for name in sorted(self.counts))
+        lines.append('')
+        lines.append('{:<30} {:>12} {:>12} {:>12}'.format('check', 'calls', 'total ms', 'mean us'))
+
+        for name in sorted(self.times, key=self.times.get, reverse=True):
+            total, calls = self.times[name], self.calls[name]
+            lines.append('{:<30} {:>12d} {:>12.1f} {:>12.2f}'.format(
+                name, calls, total * 1e3, total * 1e6 / calls
+            ))
+
+        return '\n'.join(lines)
+
+
+class TimedPattern(object):
+    """A proxy for a compiled pattern that adds the time of every call to the :class:`Stats`."""
+
+    __slots__ = ('stats', 'name', 'pattern')
+
+    def __init__(self, stats, name, pattern):
+        self.stats = stats
+        self.name = name
+        self.pattern = pattern
+
+    def match(self, *args, **kwargs):
+        start = default_timer()
+        result = self.pattern.match(*args, **kwargs)
+        self.stats.add_time(self.name, default_timer() - start)
+        return result
+
+    def search(self, *args, **kwargs):
+        start = default_timer()
+        result = self.pattern.search(*args, **kwargs)
+        self.stats.add_time(self.name, default_timer() - start)
+        return result
+
+
+class Progress(object):
+    """
+    The documents, sentences, tokens, and characters processed by a corpus run, reported to a
+    `stream` (e.g., STDERR) at most every `interval` seconds.
+
+    To keep the reports out of the processing loop, the clock is only read every `sample`
+    documents and at the end of each file. If the `total` size of the input files (in bytes) is
+    given, the reports estimate the remaining time; the current file counts by the fraction of
+    its characters processed so far.
+    If `timed`, the processing time of each document is recorded, to keep the `slowest` ones.
+    """
+
+    def __init__(self, stream=None, total=None, interval=PROGRESS_INTERVAL, timed=False,
+                 sample=PROGRESS_SAMPLE, slowest=SLOWEST):
+        self.stream = stream
+        self.total = total
+        self.interval = interval
+        self.timed = timed
+        self.sample = sample
+        self.slowest = slowest
+        self.documents = 0
+        self.sentences = 0
+        self.tokens = 0
+        self.chars = 0
+        self.files = []
+        self._heap = []  # of the slowest (seconds, documents, document ID, chars)
+        self._countdown = sample
+        self._finished = 0  # bytes of the finished files
+        self._file = None
+        self._start = self._reported = default_timer()
+
+    def clock(self):
+        """The start time to pass to :meth:`add` for a document, if the documents are timed."""
+        return default_timer() if self.timed else None
+
+    def add(self, chars, sentences=0, tokens=0, documents=1, start=None, doc_id=None):
+        """
+        Count the processed `documents` (with their `chars`, `sentences`, and `tokens`).
+
+        If the processing `start` time of a document is given, it is ranked among the slowest
+        documents by its `doc_id`, or else by its input name and number in that input.
+        """
+        self.documents += documents
+        self.sentences += sentences
+        self.tokens += tokens
+        self.chars += chars
+
+        if start is not None:
+            seconds = default_timer() - start
+
+            if len(self._heap) < self.slowest or seconds > self._heap[0][0]:
+                if doc_id is None:
+                    name, offset = ('-', 0) if self._file is None else (self._file[0], self._file[1][0])
+                    doc_id = '%s:%d' % (name, self.documents - offset)
+
+                record = (seconds, self.documents, doc_id, chars)
+
+                if len(self._heap) < self.slowest:
+                    heapq.heappush(self._heap, record)
+                else:
+                    heapq.heapreplace(self._heap, record)
+
+        self._countdown -= 1
+
+        if self._countdown <= 0:
+            self._countdown = self.sample
+            self.report()
+
+    def track(self, texts):
+        """
+        Count each file of the ``(path, text)`` pairs from :func:`segtok.corpus.read_texts`
+        (or the ``(path, batches)`` pairs from :func:`segtok.corpus.read_batches`; as their
+        length is unknown, the progress within a file is not estimated then).
+        """
+        for path, text in texts:
+            size = os.path.getsize(path)
+            length = len(text) if hasattr(text, '__len__') else 0
+            self._file = path, self._counts(), size, length, default_timer()
+            yield path, text
+            counts = [n - m for n, m in zip(self._counts(), self._file[1])]
+            self.files.append({
+                'input': path, 'bytes': size, 'seconds': default_timer() - self._file[4],
+                'documents': counts[0], 'sentences': counts[1], 'tokens': counts[2], 'chars': counts[3],
+            })
+            self._file = None
+            self._finished += size
+            self.report()
+
+    def _counts(self):
+        return self.documents, self.sentences, self.tokens, self.chars
+
+    def report(self, force=False):
+        """Write a progress report if the `interval` has passed since the last one (or if `force`)."""
+        now = default_timer()
+
+        if self.stream is None or not force and now - self._reported < self.interval:
+            return
+
+        self._reported = now
+        elapsed = now - self._start
+        line = '{:,d} documents, {:,d} sentences, {:,d} tokens, {:,d} chars in {:.0f}s ({:,.0f} chars/s)'
+        line = line.format(self.documents, self.sentences, self.tokens, self.chars, elapsed,
+                           self.chars / max(elapsed, 1e-9))
+
+        if self.total:
+            done = self._finished
+
+            if self._file is not None and self._file[3]:
+                _, counts, size, length, _ = self._file
+                done += size * min(1.0, float(self.chars - counts[3]) / length)
+
+            line += ', {:.1%} done'.format(min(1.0, float(done) / self.total))
+
+            if done:
+                eta = int(elapsed * max(0, self.total - done) / done)
+                line += ', ETA {:d}:{:02d}:{:02d}'.format(eta // 3600, eta // 60 % 60, eta % 60)
+
+        self.stream.write(line)
+        self.stream.write(os.linesep)
+        self.stream.flush()
+
+    def summary(self):
+        """The totals, the per-file timings, and the slowest documents, as a (JSON) dictionary."""
+        seconds = default_timer() - self._start
+        return {
+            'documents': self.documents,
+            'sentences': self.sentences,
+            'tokens': self.tokens,
+            'chars': self.chars,
+            'seconds': seconds,
+            'chars_per_second': self.chars / max(seconds, 1e-9),
+            'files': self.files,
+            'slowest': [{'id': doc_id, 'seconds': secs, 'chars': chars}
+                        for secs, _, doc_id, chars in sorted(self._heap, reverse=True)],
+        }
+
+
+def report_timeout(name, text, budget, stats=None):
+    """Report that `name` exceeded its time `budget` on the `text` and fell back to a simpler split."""
+    LOGGER.warning('%s exceeded its time budget of %.3fs on a text of length %d; used the fallback',
+                   name, budget, len(text))
+
+    if stats is not None:
+        stats.count('budget exceeded: ' + name)
@@ -1,8 +1,34 @@
-def split_with_spans(regex, text):
+from timeit import default_timer
+
+try:
+    TimeoutError = TimeoutError
+except NameError:
+    # Python 2.x
+    class TimeoutError(RuntimeError):
+        pass
+
+
+def split_with_spans(regex, text, timeout=None):
     last_end = 0
-    for match in regex.finditer(text):
+    for match in regex.finditer(text, timeout=timeout):
         yield text[last_end:match.start()], (last_end, match.start())
         for group_i, match_group in enumerate(match.groups()):
             yield match_group, (match.start(group_i), match.end(group_i))
         last_end = match.end()
     yield text[last_end:len(text)], (last_end, len(text))
+
+
+def time_left(deadline):
+    """
+    Return the seconds left until the `deadline` (a :func:`timeit.default_timer` value) to use
+    as a regex `timeout`, or None if there is no deadline; raise a TimeoutError once it passed.
+    """
+    if deadline is None:
+        return None
+
+    left = deadline - default_timer()
+
+    if left <= 0:
+        raise TimeoutError('time budget exceeded')
+
+    return left
@@ -24,12 +24,17 @@ Sentence splits will always be enforced at [consecutive] line separators.
 
 Important: Windows text files use ``\\r\\n`` as linebreaks and Mac files use ``\\r``;
 Convert the text to Unix linebreaks if the case.
+To map the sentence spans back to the original text, use :func:`segtok.normalizer.normalize`.
 """
 from __future__ import absolute_import, unicode_literals
 import codecs
-from regex import compile, DOTALL, UNICODE, VERBOSE
+import sys
+from threading import Lock
+from timeit import default_timer
+from regex import compile, REVERSE, UNICODE, VERBOSE
 from . import re_utils
-from . import span_utils
+from .profiling import report_timeout
+from .span_utils import pack_spans, unpack_spans
 
 
 __author__ = 'Florian Leitner <florian.leitner@gmail.com>'
@@ -43,49 +48,50 @@ SENTENCE_TERMINALS = '.!?\u203C\u203D\u2047\u2048\u2049\u3002' \
 HYPHENS = '\u00AD\u058A\u05BE\u0F0C\u1400\u1806\u2010-\u2012\u2e17\u30A0-'
 "Any valid word-breaking hyphen, including ASCII hyphen minus."
 
+ABBREVIATION_RULES = r"""
+(?: \b(?:%(abbreviations)s) # 1. known abbreviations,
+|   ^\S      # 2. a single, non-space character "sentence" (only),
+|   ^\d+     # 3. a series of digits "sentence" (only), or
+|   (?: \b   # 4. terminal letters A.-A, A.A, or A, if prefixed with:
+    # 4.a. something that makes them most likely a human first name initial
+        (?: %(titles)s
+        ) \s
+    # 4.b. if they are most likely part of an author list: (avoiding "...A and B")
+    |   (?: (?<! \b\p{Lu}\p{Lm}? ) , (?: \s %(conjunction)s )?
+        |   (?<! \b[\p{Lu},]\p{Lm}? ) \s %(conjunction)s
+        ) \s
+    # 4.c. a bracket opened just before the letters
+    |   [\[\(]
+    ) (?: # finally, the letter sequence A.-A, A.A, or A:
+        [\p{Lu}\p{Lt}] \p{Lm}? \. # optional A.
+        [%(hyphens)s]?            # optional hyphen
+    )? [\p{Lu}\p{Lt}] \p{Lm}?     # required A
+) $"""
+"The ABBREVIATIONS template; a language profile fills in its abbreviations, titles, and conjunction."
+
+_abbreviations = lambda words, titles, conjunction: compile(ABBREVIATION_RULES % dict(
+    abbreviations='|'.join(sorted(set(words + [w.capitalize() for w in words if w[0].islower()]))),
+    titles=titles, conjunction=conjunction, hyphens=HYPHENS
+), UNICODE | VERBOSE)
+
 # Use upper-case for abbreviations that always are capitalized:
 # Lower-case abbreviations may occur capitalized or not.
 # Only abbreviations that should never occur at the end of a sentence
 # (such as "etc.")
-ABBREVIATIONS = """
+_DEFAULT_ABBREVIATIONS = r"""
 approx Capt cf Col Dr f\.?e figs? Gen e\.?g i\.?e i\.?v
 Mag med Mr Mrs Mt nat No nr p\.e phil prof rer
 sci Sgt Sr Sra Srta St univ vol vs z\.B
 Jän Jan Ene Feb Mär Mar Apr Abr May Jun Jul Aug Sep Sept Oct Okt Nov Dic Dez Dec
 E\.U U\.K U\.S
-""".split()
-ABBREVIATIONS.extend(a.capitalize() for a in ABBREVIATIONS if a[0].islower())
-ABBREVIATIONS = '|'.join(sorted(ABBREVIATIONS))
-ABBREVIATIONS = compile(r"""
-(?: \b(?:%s) # 1. known abbreviations,
-|   ^\S      # 2. a single, non-space character "sentence" (only),
-|   ^\d+     # 3. a series of digits "sentence" (only), or
-|   (?: \b   # 4. terminal letters A.-A, A.A, or A, if prefixed with:
-    # 4.a. something that makes them most likely a human first name initial
-        (?: [Bb]y
+"""
+_DEFAULT_TITLES = r"""[Bb]y
         |   [Cc](?:aptain|ommander)
         |   [Dd]o[ck]tor
         |   [Gg]eneral
         |   [Mm](?:ag)?is(?:ter|s)
         |   [Pp]rofessor
-        |   [Ss]e\u00F1or(?:it)?a?
-        ) \s
-    # 4.b. if they are most likely part of an author list: (avoiding "...A and B")
-    |   (?: (?<! \b\p{Lu}\p{Lm}? ) , (?: \s and )?
-        |   (?<! \b[\p{Lu},]\p{Lm}? ) \s and
-        ) \s
-    # 4.c. a bracket opened just before the letters
-    |   [\[\(]
-    ) (?: # finally, the letter sequence A.-A, A.A, or A:
-        [\p{Lu}\p{Lt}] \p{Lm}? \. # optional A.
-        [%s]?                     # optional hyphen
-    )? [\p{Lu}\p{Lt}] \p{Lm}?     # required A
-) $""" % (ABBREVIATIONS, HYPHENS), UNICODE | VERBOSE)
-"""
-Common abbreviations at the candidate sentence end that normally don't terminate a sentence.
-Note that a check is required to ensure the potential abbreviation is actually followed by a dot
-and not some other sentence segmentation marker.
-"""
+        |   [Ss]e\u00F1or(?:it)?a?"""
 
 # PMC OA corpus statistics
 # SSs: sentence starters
@@ -109,13 +115,14 @@ and not some other sentence segmentation marker.
 # whether
 
 ENDS_IN_DATE_DIGITS = compile(r"\b[0123]?[0-9]$")
-MONTH = compile(r"(J[äa]n|Ene|Feb|M[äa]r|A[pb]r|May|Jun|Jul|Aug|Sep|O[ck]t|Nov|D[ei][cz]|0?[1-9]|1[012])")
-"""
-Special facilities to detect European-style dates.
-"""
-
-CONTINUATIONS = compile(r""" ^ # at string start only
-(?: a(?: nd|re )
+_month = lambda months: compile(r"(%s)" % months)
+# Special facilities to detect European-style dates.
+_DEFAULT_MONTHS = r"J[äa]n|Ene|Feb|M[äa]r|A[pb]r|May|Jun|Jul|Aug|Sep|O[ck]t|Nov|D[ei][cz]|0?[1-9]|1[012]"
+
+_continuations = lambda words: compile(r""" ^ # at string start only
+(?: %s
+)\b""" % words, UNICODE | VERBOSE)
+_ENGLISH_CONTINUATIONS = r"""a(?: nd|re )
 |   b(?: etween|y )
 |   from
 |   has
@@ -123,22 +130,23 @@ CONTINUATIONS = compile(r""" ^ # at string start only
 |   o[fr]
 |   t(?: han|hat|hrough )
 |   via
-|   w(?: as|ere|hether|ith )
-)\b""", UNICODE | VERBOSE)
-"Lower-case words that in the given form usually don't start a sentence."
+|   w(?: as|ere|hether|ith )"""
 
-BEFORE_LOWER = compile(r""" .*?
+BEFORE_LOWER = compile(r"""
 (?: [%s]"[\)\]]*           # ."]) .") ."
 |   [%s] [\)\]]+           # .]) .)
 |   \b spp \.              # spp.  (species pluralis)
 |   \b \p{L} \p{Ll}? \.    # Ll. L.
-) \s+ $""" % (SENTENCE_TERMINALS, SENTENCE_TERMINALS), DOTALL | UNICODE | VERBOSE
+) \s+ $""" % (SENTENCE_TERMINALS, SENTENCE_TERMINALS), REVERSE | UNICODE | VERBOSE
 )
 """
 Endings that, if followed by a lower-case word, are not sentence terminals:
 - Quotations and brackets ("Hello!" said the man.)
 - dotted abbreviations (U.S.A. was)
 - genus-species-like (m. musculus)
+
+This is a reverse pattern: ``match`` anchors it at the end of the string, so only the
+string's tail is inspected, independent of the string's length.
 """
 LOWER_WORD = compile(r'^\p{Ll}+[%s]?\p{Ll}*\b' % HYPHENS, UNICODE)
 "Lower-case words are not sentence starters (after an abbreviation)."
@@ -152,8 +160,22 @@ UPPER_WORD_START = compile(r'^\p{Lu}\p{Ll}+\b', UNICODE)
 LONE_WORD = compile(r'^\p{Ll}+[\p{Ll}\p{Nd}%s]*$' % HYPHENS, UNICODE)
 "Any 'lone' lower-case word [with hyphens or digits inside] is a continuation."
 
-UPPER_CASE_END = compile(r'\b[\p{Lu}\p{Lt}]\p{L}*\.\s+$', UNICODE)
-"Inside brackets, 'Words' that can be part of a proper noun abbreviation, like a journal name."
+_segment_end = lambda abbreviations: compile(
+    r'(?P<ABBREVIATIONS>%s)|(?P<MONTH>%s)|(?P<MIDDLE_INITIAL_END>%s)' % (
+        abbreviations.pattern, ENDS_IN_DATE_DIGITS.pattern, MIDDLE_INITIAL_END.pattern
+    ), REVERSE | UNICODE | VERBOSE
+)
+_segment_start = lambda month: compile(
+    r'(?=(?P<MONTH>%s)|)(?=(?P<MIDDLE_INITIAL_END>%s)|)(?P<LONE_WORD>%s)?' % (
+        month.pattern, UPPER_WORD_START.pattern, LONE_WORD.pattern
+    ), UNICODE
+)
+
+UPPER_CASE_END = compile(r'\b[\p{Lu}\p{Lt}]\p{L}*\.\s+$', REVERSE | UNICODE)
+"""
+Inside brackets, 'Words' that can be part of a proper noun abbreviation, like a journal name.
+A reverse pattern, like BEFORE_LOWER: Use ``match`` to only inspect the string's tail.
+"""
 UPPER_CASE_START = compile(r'^(?:(?:\(\d{4}\)\s)?[\p{Lu}\p{Lt}]\p{L}*|\d+)[\.,:]\s+', UNICODE)
 "Inside brackets, 'Words' that can be part of a large abbreviation, like a journal name."
 
@@ -161,6 +183,21 @@ SHORT_SENTENCE_LENGTH = 55
 "Length of either sentence fragment inside brackets to assume the fragment is not its own sentence."
 # This can be increased/decreased to heighten/lower the likelihood of splits inside brackets.
 
+BREAK_CHAR = compile(r'[\n%s]' % SENTENCE_TERMINALS, UNICODE)
+"Any char that could end a sentence: if a text has none, it is one sentence (fast path)."
+
+PARAGRAPH_BREAK = compile(r'\n\n(?=\S)', UNICODE)
+"Consecutive newlines followed by text: the cut points for :func:`split_multi_parallel`."
+
+PARALLEL_CHUNK_SIZE = 1 << 20
+"The (minimum) number of characters per piece that :func:`split_multi_parallel` segments."
+
+PARALLEL_OVERLAP = 1 << 12
+"The (minimum) number of characters a piece overlaps into the next one to stitch them."
+
+STREAM_BUFFER_SIZE = 1 << 16
+"The number of characters :func:`rewrite_line_separators_stream` buffers at most (per paragraph)."
+
 NON_UNIX_LINEBREAK = compile(r'(?:\r\n|\r|\u2028)', UNICODE)
 "All linebreak sequence variants except the Unix newline (only)."
 
@@ -189,6 +226,81 @@ DO_NOT_CROSS_LINES = _compile(1)
 MAY_CROSS_ONE_LINE = _compile(2)
 "A segmentation pattern where two or more newline chars also terminate sentences."
 
+_NEVER = r'(?!)'  # a pattern that never matches: leaves out a rule
+
+_GENERIC = r"cf Dr e\.?g figs? i\.?e i\.?v med nat No nr phil prof rer sci St univ vol vs E\.U U\.K U\.S"
+_NUMERIC_MONTH = r"0?[1-9]|1[012]"
+
+LANGUAGES = {
+    'generic': dict(
+        abbreviations=_GENERIC,
+        titles=_NEVER,
+        conjunction=_NEVER,
+        months=_NUMERIC_MONTH,
+        continuations=_NEVER,
+    ),
+    'en': dict(
+        abbreviations=_GENERIC + r"""
+            approx Capt Col f\.?e Gen Mr Mrs Mt Sgt
+            Jan Feb Mar Apr May Jun Jul Aug Sep Sept Oct Nov Dec""",
+        titles=r"[Bb]y | [Cc](?:aptain|ommander) | [Dd]octor | [Gg]eneral | [Mm]is(?:ter|s) | [Pp]rofessor",
+        conjunction='and',
+        months=r"Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|" + _NUMERIC_MONTH,
+        continuations=_ENGLISH_CONTINUATIONS,
+    ),
+    'de': dict(
+        abbreviations=_GENERIC + r"""
+            Mag z\.B
+            Jän Jan Feb Mär Mar Apr Jun Jul Aug Sep Sept Okt Nov Dez""",
+        titles=r"[Dd]oktor | [Gg]eneral | [Mm]agister | [Pp]rofessor",
+        conjunction='und',
+        months=r"J[äa]n|Feb|M[äa]r|Apr|Mai|Jun|Jul|Aug|Sep|Okt|Nov|Dez|" + _NUMERIC_MONTH,
+        continuations=r"als | bzw | durch | ist | mit | oder | sind | sowie | und | von | w(?: ar|aren|ie ) | zwischen",
+    ),
+    'es': dict(
+        abbreviations=_GENERIC + r"""
+            p\.e Sr Sra Srta
+            Ene Feb Mar Abr May Jun Jul Sep Sept Oct Nov Dic""",
+        titles=r"[Dd]octora? | [Gg]eneral | [Pp]rofesora? | [Ss]e\u00F1or(?:it)?a?",
+        conjunction='y',
+        months=r"Ene|Feb|Mar|Abr|May|Jun|Jul|Ago|Sep|Oct|Nov|Dic|" + _NUMERIC_MONTH,
+        continuations=r"como | con | del? | entre | es | o | para | por | que | son | u | y",
+    ),
+}
+"""
+The lexicons of the language profiles that can be selected with the `language` parameter;
+the ``generic`` profile only has language-independent (Latin and scientific) abbreviations.
+Each profile is compiled on first use (see :func:`language_profile`).
+"""
+
+DEFAULT_LEXICON = dict(
+    abbreviations=_DEFAULT_ABBREVIATIONS,
+    titles=_DEFAULT_TITLES,
+    conjunction='and',
+    months=_DEFAULT_MONTHS,
+    continuations=_ENGLISH_CONTINUATIONS,
+)
+"""
+The lexicon used without a language, combining English, German, and Spanish;
+like the language profiles, it is compiled on first use.
+Its patterns are available as module attributes, too:
+
+- ``ABBREVIATIONS``: Common abbreviations at the candidate sentence end that normally don't
+  terminate a sentence. Note that a check is required to ensure the potential abbreviation is
+  actually followed by a dot and not some other sentence segmentation marker.
+- ``MONTH``: Special facilities to detect European-style dates.
+- ``CONTINUATIONS``: Lower-case words that in the given form usually don't start a sentence.
+- ``SEGMENT_END``: ABBREVIATIONS, ENDS_IN_DATE_DIGITS, and MIDDLE_INITIAL_END in one reverse
+  pattern: ``match`` tries them in this order at the end of the segment before a dot, and the
+  match's ``lastgroup`` names the (joining) rule the segment's end can take part in.
+- ``SEGMENT_START``: MONTH, UPPER_WORD_START, and LONE_WORD in one pattern that always matches:
+  each group is set if its pattern matches the start of the segment after a dot, and is named
+  by the rule it is used in.
+"""
+
+_PROFILES = {}
+_PROFILES_LOCK = Lock()
+
 
 def strip_sent_with_span(text, span):
     orig_len = len(text)
@@ -200,23 +312,205 @@ def strip_sent_with_span(text, span):
     return text, (span[0] + left_offset, span[1] - right_offset)
 
 
-def split_single(text, join_on_lowercase=False, short_sentence_length=SHORT_SENTENCE_LENGTH):
+def split_single(text, join_on_lowercase=False, short_sentence_length=SHORT_SENTENCE_LENGTH, stats=None,
+                 budget=None, language=None):
     """
     Default: split `text` at sentence terminals and at newline chars.
     """
-    sentences = _sentences(re_utils.split_with_spans(DO_NOT_CROSS_LINES, text), join_on_lowercase, short_sentence_length)
-    return [span_utils.make_sub((ss_text, ss_span), s)
-            for ss_text, ss_span in sentences
-            for s in split_newline(ss_text)
-        ]
+    rules = language_profile(language)
+
+    if budget is not None:
+        return _within_budget('split_single', text, budget, stats, lambda deadline: _split_single(
+            text, join_on_lowercase, short_sentence_length, stats, deadline, rules
+        ))
 
+    return _split_single(text, join_on_lowercase, short_sentence_length, stats, rules=rules)
 
-def split_multi(text, join_on_lowercase=False, short_sentence_length=SHORT_SENTENCE_LENGTH):
+
+def split_multi(text, join_on_lowercase=False, short_sentence_length=SHORT_SENTENCE_LENGTH, stats=None,
+                budget=None, language=None):
     """
     Sentences may contain non-consecutive (single) newline chars, while consecutive newline chars
     ("paragraph separators") always split sentences.
     """
-    return _sentences(re_utils.split_with_spans(MAY_CROSS_ONE_LINE, text), join_on_lowercase, short_sentence_length)
+    rules = language_profile(language)
+
+    if budget is not None:
+        return _within_budget('split_multi', text, budget, stats, lambda deadline: _split_multi(
+            text, join_on_lowercase, short_sentence_length, stats, deadline, rules
+        ))
+
+    return _split_multi(text, join_on_lowercase, short_sentence_length, stats, rules=rules)
+
+
+def _split_single(text, join_on_lowercase, short_sentence_length, stats=None, deadline=None, rules=None):
+    if BREAK_CHAR.search(text) is None:
+        return list(_lines(text, 0))
+
+    return list(_sentences(_split(DO_NOT_CROSS_LINES, text, stats, deadline), join_on_lowercase,
+                           short_sentence_length, stats, deadline, split_lines=True, rules=rules))
+
+
+def _split_multi(text, join_on_lowercase, short_sentence_length, stats=None, deadline=None, rules=None):
+    if BREAK_CHAR.search(text) is None:
+        return iter([strip_sent_with_span(text, (0, len(text)))])
+
+    return _sentences(_split(MAY_CROSS_ONE_LINE, text, stats, deadline), join_on_lowercase,
+                      short_sentence_length, stats, deadline, rules=rules)
+
+
+def language_profile(language):
+    """
+    The compiled patterns of the `language` profile in :data:`LANGUAGES` (or of the
+    :data:`DEFAULT_LEXICON` if the `language` is None), by pattern name.
+
+    A profile is only compiled when it is first requested; the lock ensures that
+    concurrent threads compile it once.
+
+    :raise ValueError: if there is no profile for the `language`
+    """
+    try:
+        return _PROFILES[language]
+    except KeyError:
+        if language is not None and language not in LANGUAGES:
+            raise ValueError('no profile for language %r; choose one of: %s' % (
+                language, ', '.join(sorted(LANGUAGES))
+            ))
+
+    with _PROFILES_LOCK:
+        if language not in _PROFILES:
+            lexicon = DEFAULT_LEXICON if language is None else LANGUAGES[language]
+            abbreviations = _abbreviations(lexicon['abbreviations'].split(), lexicon['titles'],
+                                           lexicon['conjunction'])
+            month = _month(lexicon['months'])
+            _PROFILES[language] = dict(
+                ABBREVIATIONS=abbreviations,
+                MONTH=month,
+                CONTINUATIONS=_continuations(lexicon['continuations']),
+                SEGMENT_END=_segment_end(abbreviations),
+                SEGMENT_START=_segment_start(month),
+            )
+
+        return _PROFILES[language]
+
+
+_DEFAULT_PATTERNS = ('ABBREVIATIONS', 'MONTH', 'CONTINUATIONS', 'SEGMENT_END', 'SEGMENT_START')
+
+
+def __getattr__(name):
+    # the default patterns are module attributes, but only compiled on first use (PEP 562)
+    if name in _DEFAULT_PATTERNS:
+        return language_profile(None)[name]
+
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+if sys.version_info < (3, 7):  # no module __getattr__
+    globals().update(language_profile(None))
+
+
+def _within_budget(name, text, budget, stats, splitter):
+    """
+    Run the `splitter` with a deadline `budget` seconds from now and return its sentences as a list.
+
+    If the budget is exceeded, the time-out is reported and the `text` is split at newlines only.
+    """
+    try:
+        return list(splitter(default_timer() + budget))
+    except re_utils.TimeoutError:
+        report_timeout(name, text, budget, stats)
+        return list(split_newline(text))
+
+
+def split_multi_parallel(text, join_on_lowercase=False, short_sentence_length=SHORT_SENTENCE_LENGTH,
+                         processes=None, chunk_size=PARALLEL_CHUNK_SIZE, threads=None, language=None):
+    """
+    Like :func:`split_multi`, but cut a large `text` at paragraph separators into pieces of
+    (at least) `chunk_size` characters and segment them in parallel `processes`.
+
+    Each piece overlaps into the next one, and the pieces are stitched together where both
+    agree on two consecutive sentences; should they never agree, the text is segmented serially.
+    Therefore, the result always is the same (list) as :func:`split_multi` would produce.
+    The workers only send back the sentence offsets, as compact byte strings (see
+    :func:`segtok.span_utils.pack_spans`), and the sentences are sliced from the `text` again.
+
+    If a number of `threads` is given, the pieces are segmented by a pool of threads instead
+    of processes, which saves pickling the pieces.
+    """
+    language_profile(language)  # fail early on an unknown language
+    cuts = [0]
+
+    while True:
+        cut = PARAGRAPH_BREAK.search(text, cuts[-1] + chunk_size)
+
+        if cut is None:
+            break
+
+        cuts.append(cut.end())
+
+    if len(cuts) == 1:
+        return list(split_multi(text, join_on_lowercase, short_sentence_length, language=language))
+
+    jobs = [(text[start:_overlap_end(text, end)], start, join_on_lowercase, short_sentence_length, language)
+            for start, end in zip(cuts, cuts[1:])]
+    jobs.append((text[cuts[-1]:], cuts[-1], join_on_lowercase, short_sentence_length, language))
+
+    if threads is None:
+        from multiprocessing import Pool
+        pool = Pool(processes)
+    else:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(threads)
+
+    try:
+        pieces = pool.map(_split_multi_piece, jobs, chunksize=1)
+    finally:
+        pool.close()
+
+    spans = unpack_spans(pieces[0])
+
+    for piece in pieces[1:]:
+        spans = _stitch(spans, unpack_spans(piece))
+
+        if spans is None:
+            return list(split_multi(text, join_on_lowercase, short_sentence_length, language=language))
+
+    return [(text[start:end], (start, end)) for start, end in spans]
+
+
+def _overlap_end(text, end):
+    """The end of the overlap of a piece that ends at `end`: the next paragraph break."""
+    cut = PARAGRAPH_BREAK.search(text, end + PARALLEL_OVERLAP)
+    return len(text) if cut is None else cut.end()
+
+
+def _split_multi_piece(job):
+    """
+    Segment a piece of a text with :func:`split_multi` and return the sentence spans,
+    shifted by the piece's offset, packed into a byte string.
+    """
+    piece, offset, join_on_lowercase, short_sentence_length, language = job
+    return pack_spans((start + offset, end + offset) for _, (start, end) in
+                      split_multi(piece, join_on_lowercase, short_sentence_length, language=language))
+
+
+def _stitch(head, tail):
+    """
+    Join the sentence spans of two overlapping pieces where they agree on two consecutive
+    sentences.
+
+    The last sentence of the `head` is not trusted because it was cut off at the overlap's end.
+    Returns None if there is no such agreement.
+    """
+    positions = dict((span, i) for i, span in enumerate(head[:-2]))
+
+    for j in range(len(tail) - 1):
+        i = positions.get(tail[j])
+
+        if i is not None and head[i + 1] == tail[j + 1]:
+            return head[:i + 1] + tail[j + 1:]
+
+    return None
 
 
 def split_newline(text):
@@ -232,7 +526,8 @@ def split_newline(text):
 
 
 def rewrite_line_separators(text, pattern, join_on_lowercase=False,
-                            short_sentence_length=SHORT_SENTENCE_LENGTH):
+                            short_sentence_length=SHORT_SENTENCE_LENGTH, stats=None, budget=None,
+                            language=None):
     """
     Remove line separator chars inside sentences and ensure there is a ``\\n`` at their end.
 
@@ -241,11 +536,139 @@ def rewrite_line_separators(text, pattern, join_on_lowercase=False,
     :param join_on_lowercase: always join sentences that start with lower-case
     :param short_sentence_length: the upper boundary for text spans that are not split
                                   into sentences inside brackets
+    :param stats: an optional :class:`segtok.profiling.Stats` instance to record rule counts
+                  and check timings
+    :param budget: an optional time budget in seconds; if exceeded, each line is kept as is
+    :param language: an optional language profile name (see :data:`LANGUAGES`)
     :return: a generator yielding the spans of text
     """
+    sentences = _rewrite_sentences(text, pattern, join_on_lowercase, short_sentence_length, stats, budget,
+                                   language_profile(language))
+
     offset = 0
 
-    for sentence_text, sentence_span in _sentences(re_utils.split_with_spans(pattern, text), join_on_lowercase, short_sentence_length):
+    for item in _rewrite(text, sentences):
+        if item[1] is not None:
+            offset = item[1][1]
+
+        yield item
+
+    if offset < len(text):
+        yield text[offset:], (offset, len(text))
+
+
+def rewrite_line_separators_stream(lines, pattern, join_on_lowercase=False,
+                                   short_sentence_length=SHORT_SENTENCE_LENGTH, stats=None, budget=None,
+                                   buffer_size=STREAM_BUFFER_SIZE, language=None):
+    """
+    Stream :func:`rewrite_line_separators` over an iterable of text `lines`, like a file.
+
+    The lines are buffered up to a paragraph separator (an empty line) or until `buffer_size`
+    characters are buffered, and the buffered block is rewritten and yielded right away -
+    except for its last two sentences: They are carried over into the next block, together
+    with the last yielded sentence as context, so sentence joins across the block boundary are
+    decided as if the whole text were rewritten at once.
+    If a block has too few sentences to yield any, the buffer limit is doubled until it does,
+    so a long sentence (e.g., a text without sentence terminals) is segmented a logarithmic
+    number of times only; the buffer then holds at most about twice the longest sentence.
+
+    :return: a generator yielding the spans of text, with offsets into the whole stream
+    """
+    rules = language_profile(language)
+    segment = lambda text: _rewrite_sentences(text, pattern, join_on_lowercase, short_sentence_length,
+                                              stats, budget, rules)
+    buffered = []
+    size = 0
+    limit = buffer_size  # raised while the buffer cannot be flushed
+    position = 0  # of the buffer's start in the stream
+    anchor = 0  # end of the last yielded sentence, kept at the start of the buffer as context
+
+    for line in lines:
+        buffered.append(line)
+        size += len(line)
+
+        if size >= limit or (limit == buffer_size and not line.strip()):
+            text = ''.join(buffered)
+            sentences = _after(segment(text), anchor, text)
+
+            while sentences and not sentences[-1][0]:
+                sentences.pop()  # empty sentences at the end of the block
+
+            if len(sentences) > 2 and sentences[-3][0]:
+                offset = anchor
+
+                for item in _rewrite(text, sentences[:-2], anchor):
+                    if item[1] is not None:
+                        offset = item[1][1]
+
+                    yield _shift(item, position)
+
+                anchor = len(sentences[-3][0])
+                cut = offset - anchor
+                position += cut
+                text = text[cut:]
+                limit = buffer_size
+            else:
+                limit = max(buffer_size, 2 * len(text))
+
+            buffered = [text]
+            size = len(text)
+
+    text = ''.join(buffered)
+    offset = anchor
+
+    for item in _rewrite(text, _after(segment(text), anchor, text), anchor):
+        if item[1] is not None:
+            offset = item[1][1]
+
+        yield _shift(item, position)
+
+    if offset < len(text):
+        yield text[offset:], (position + offset, position + len(text))
+
+
+def _after(sentences, anchor, text):
+    """
+    Drop the (already yielded) sentences before the `anchor` offset of the `text`;
+    a sentence that now extends across the anchor is cut at it.
+    """
+    for idx, (sentence_text, span) in enumerate(sentences):
+        if span[1] > anchor:
+            break
+    else:
+        return []
+
+    if span[0] < anchor:
+        sentences[idx] = text[anchor:span[1]].lstrip(), (anchor, span[1])
+
+    return sentences[idx:]
+
+
+def _shift(item_with_span, position):
+    """Shift the span of an ``(item, span)`` pair by `position`."""
+    item, span = item_with_span
+    return item, None if span is None else (span[0] + position, span[1] + position)
+
+
+def _rewrite_sentences(text, pattern, join_on_lowercase, short_sentence_length, stats, budget, rules):
+    """Segment the `text` for rewriting its line separators (into a list)."""
+    split = lambda deadline: _sentences(_split(pattern, text, stats, deadline), join_on_lowercase,
+                                        short_sentence_length, stats, deadline, rules=rules)
+
+    if budget is None:
+        return list(split(None))
+
+    return _within_budget('rewrite_line_separators', text, budget, stats, split)
+
+
+def _rewrite(text, sentences, offset=0):
+    """
+    Yield the intervening text and the sentence with its line separators replaced by spaces
+    for each of the `sentences` in the `text` after the `offset`, ensuring there is a newline
+    before each sentence (but the first in the text).
+    """
+
+    for sentence_text, sentence_span in sentences:
         start = text.index(sentence_text, offset)
         intervening = text[offset:start]
 
@@ -257,56 +680,123 @@ def rewrite_line_separators(text, pattern, join_on_lowercase=False,
         yield sentence_text.replace('\n', ' '), (start, start + len(sentence_text))
         offset = start + len(sentence_text)
 
-    if offset < len(text):
-        yield text[offset:], (offset, len(text))
-
 
 def to_unix_linebreaks(text):
     """Replace non-Unix linebreak sequences (Windows, Mac, Unicode) with newlines (\\n)."""
     return NON_UNIX_LINEBREAK.sub('\n', text)
 
 
-def _sentences(spans, join_on_lowercase, short_sentence_length):
-    """Join spans back together into sentences as necessary."""
+def _split(pattern, text, stats=None, deadline=None):
+    """Split the `text` into spans of alternating segments and (potential) terminal markers."""
+    if stats is None:
+        return re_utils.split_with_spans(pattern, text, re_utils.time_left(deadline))
+
+    start = default_timer()
+    spans = list(re_utils.split_with_spans(pattern, text, re_utils.time_left(deadline)))
+    stats.add_time('split', default_timer() - start)
+    return spans
+
+
+def _patterns(stats, rules, *names):
+    """
+    Fetch the named patterns from the `rules` of a language profile (by default, the patterns
+    of the :data:`DEFAULT_LEXICON`), if it has them, or else the module-level patterns,
+    wrapped for timing if `stats` are recorded.
+    """
+    if rules is None:
+        rules = language_profile(None)
+
+    module = globals()
+    patterns = [rules[name] if name in rules else module[name] for name in names]
+
+    if stats is None:
+        return patterns
+
+    return [stats.timed(name, pattern) for name, pattern in zip(names, patterns)]
+
+
+def _sentences(spans, join_on_lowercase, short_sentence_length, stats=None, deadline=None,
+               split_lines=False, rules=None):
+    """
+    Join spans back together into sentences as necessary.
+
+    If `split_lines` is set, each sentence is split at its newlines as it is produced
+    (see :func:`_lines`).
+    The `rules` are the patterns of a language profile (see :func:`_patterns`).
+    If a `deadline` is given, a TimeoutError is raised when it passes.
+    """
     last = None
     shorterThanATypicalSentence = lambda c, l: c < short_sentence_length or l < short_sentence_length
+    before_lower, lower_word, upper_case_end, upper_case_start, continuations = _patterns(
+        stats, rules, 'BEFORE_LOWER', 'LOWER_WORD', 'UPPER_CASE_END', 'UPPER_CASE_START', 'CONTINUATIONS'
+    )
 
-    for current in _abbreviation_joiner(spans):
+    for current in _abbreviation_joiner(spans, stats, rules):
         current_text, current_span = current
         if last is not None:
+            if deadline is not None:
+                re_utils.time_left(deadline)
+
             last_text, last_span = last
-            if (join_on_lowercase or BEFORE_LOWER.match(last_text)) and LOWER_WORD.match(current_text):
-                do_join = True
+            if (join_on_lowercase or before_lower.match(last_text)) and lower_word.match(current_text):
+                rule = 'LOWER_WORD'
             elif shorterThanATypicalSentence(len(current_text), len(last_text)) and _is_open(last_text) and (
                 _is_not_opened(current_text) or last_text.endswith(' et al. ') or (
-                    UPPER_CASE_END.search(last_text) and UPPER_CASE_START.match(current_text)
+                    upper_case_end.match(last_text) and upper_case_start.match(current_text)
                 )
             ):
-                do_join = True
+                rule = 'brackets ()'
             elif shorterThanATypicalSentence(len(current_text), len(last_text)) and _is_open(last_text, '[]') and (
                 _is_not_opened(current_text, '[]') or last_text.endswith(' et al. ') or (
-                    UPPER_CASE_END.search(last_text) and UPPER_CASE_START.match(current_text)
+                    upper_case_end.match(last_text) and upper_case_start.match(current_text)
                 )
             ):
-                do_join = True
-            elif CONTINUATIONS.match(current_text):
-                do_join = True
+                rule = 'brackets []'
+            elif continuations.match(current_text):
+                rule = 'CONTINUATIONS'
             else:
-                do_join = False
-            if do_join:
+                rule = None
+            if stats is not None:
+                stats.count('split' if rule is None else 'join: ' + rule)
+            if rule is not None:
                 last = ('%s%s' % (last_text, current_text), (last_span[0], current_span[1]))
             else:
-                yield strip_sent_with_span(last_text, last_span)
+                if split_lines:
+                    for line in _lines(last_text, last_span[0]):
+                        yield line
+                else:
+                    yield strip_sent_with_span(last_text, last_span)
                 last = current
         else:
             last = current
 
     if last is not None:
         last_text, last_span = last
-        yield strip_sent_with_span(last_text, last_span)
+        if split_lines:
+            for line in _lines(last_text, last_span[0]):
+                yield line
+        else:
+            yield strip_sent_with_span(last_text, last_span)
+
+
+def _lines(text, offset):
+    """
+    Yield the stripped lines with content of a sentence `text` starting at `offset`, with their spans.
+
+    The same as stripping the sentence, applying :func:`split_newline`, and shifting the line
+    spans by the sentence's start, but without the intermediate strings and tuples.
+    """
+    for line in text.split('\n'):
+        content = line.strip()
 
+        if content:
+            start = offset + len(line) - len(line.lstrip())
+            yield content, (start, start + len(content))
 
-def _abbreviation_joiner(spans):
+        offset += len(line) + 1
+
+
+def _abbreviation_joiner(spans, stats=None, rules=None):
     """Join spans that match the ABBREVIATIONS pattern."""
     spans = list(spans)
     segment = None
@@ -314,6 +804,7 @@ def _abbreviation_joiner(spans):
         text = ''.join(s_t for s_t, s_s in spans[start:end])
         return text, (spans[start][1][0], spans[end - 1][1][1])
     total = len(spans)
+    segment_end, segment_start = _patterns(stats, rules, 'SEGMENT_END', 'SEGMENT_START')
 
     for pos in range(total):
         if pos and pos % 2:  # even => segment, uneven => (potential) terminal
@@ -322,18 +813,28 @@ def _abbreviation_joiner(spans):
             next_s_text, next_s_span, = spans[pos+1] if pos + 1 < total else None
 
             if prev_s_text[-1:].isspace():
-                pass # join
-            elif marker_text[0] == '.' and ABBREVIATIONS.search(prev_s_text):
-                pass # join
-            elif marker_text[0] == '.' and next_s_text and (
-                    LONE_WORD.match(next_s_text) or
-                    (ENDS_IN_DATE_DIGITS.search(prev_s_text) and MONTH.match(next_s_text)) or
-                    (MIDDLE_INITIAL_END.search(prev_s_text) and UPPER_WORD_START.match(next_s_text))
-                    ):
-                pass # join
+                rule = 'trailing space'
+            elif marker_text[0] != '.':
+                rule = None
             else:
+                end = segment_end.match(prev_s_text)
+                rule = None if end is None else end.lastgroup
+
+                if rule != 'ABBREVIATIONS':
+                    start = segment_start.match(next_s_text) if next_s_text else None
+
+                    if start is None:
+                        rule = None
+                    elif start.group('LONE_WORD') is not None:
+                        rule = 'LONE_WORD'
+                    elif rule is not None and start.group(rule) is None:
+                        rule = None
+
+            if rule is None:
                 yield makeSentence(segment, pos + 1)
                 segment = None
+            elif stats is not None:
+                stats.count('join: ' + rule)
         elif segment is None:
             segment = pos
 
@@ -408,7 +909,8 @@ def main():
     from argparse import ArgumentParser
     from sys import argv, stdout, stdin, stderr, getdefaultencoding, version_info
     from os import path, linesep
-    from . import utils
+    from . import corpus, utils
+    from .profiling import PROGRESS_INTERVAL
 
     single, multi = 0, 1
 
@@ -416,7 +918,22 @@ def main():
                             description=__doc__, prog=path.basename(argv[0]),
                             epilog='default encoding: ' + getdefaultencoding())
     parser.add_argument('files', metavar='FILE', nargs='*',
-                        help='UTF-8 plain-text file(s); if absent, read from STDIN')
+                        help='UTF-8 plain-text file(s), optionally compressed (.gz, .bz2, .xz), '
+                             'directories, or glob patterns; if absent, read from STDIN')
+    parser.add_argument('--output-dir', '-o', metavar='DIR',
+                        help='write the sentences of each input file to a file of the same '
+                             'name (without compression extension) in DIR')
+    parser.add_argument('--readers', metavar='N', type=int, default=1,
+                        help='number of threads reading and decompressing input files '
+                             'ahead of the segmentation; 0 reads them on demand [%(default)d]')
+    parser.add_argument('--shard-size', metavar='N', type=int, default=corpus.SHARD_SIZE,
+                        help='with --output-dir, write the output for STDIN to numbered '
+                             'shards of N input lines [%(default)d]')
+    parser.add_argument('--resume', action='store_true',
+                        help='with --output-dir, record the finished shards in a manifest '
+                             'there and skip them when run again (skip the IDs of finished '
+                             'shards if --with-ids is used, or else the number of lines); an '
+                             'input file is one document, so a cut-off file starts over')
     parser.add_argument('--with-ids', action='store_true',
                         help='STDIN (only!) input is ID-tab-TEXT; the ID is '
                              'preserved in the output as ID-tab-N-tab-SENTENCE '
@@ -428,7 +945,31 @@ def main():
                         default=SHORT_SENTENCE_LENGTH,
                         help="upper boundary for text spans that are not split "
                              "into sentences inside brackets [%(default)d]")
+    parser.add_argument('--lang', metavar='LANG', choices=sorted(LANGUAGES),
+                        help='use the abbreviations and rules of one language profile only '
+                             '(%(choices)s); by default, they are combined')
     parser.add_argument('--encoding', '-e', help='force another encoding to use')
+    parser.add_argument('--profile', action='store_true',
+                        help='print rule counts and pattern timings to STDERR when done')
+    parser.add_argument('--progress', metavar='SECONDS', type=float, nargs='?',
+                        const=PROGRESS_INTERVAL,
+                        help='report the documents, sentences, and characters processed, the '
+                             'throughput, and (for input files) the remaining time to STDERR '
+                             'every SECONDS [%(const)s]')
+    parser.add_argument('--stats-json', metavar='PATH',
+                        help='write the totals, the timings per input file, and the slowest '
+                             'documents (by ID, or by input name and number) as JSON to PATH')
+    parser.add_argument('--budget', metavar='SECONDS', type=float,
+                        help='time budget per text; texts that take longer are only split '
+                             'at newlines, and a warning is printed')
+    parser.add_argument('--index', metavar='PATH',
+                        help='also write the sentence offsets of each input text (file, '
+                             'STDIN line, or the whole STDIN stream in multi-line mode) to a '
+                             'binary index at PATH; see segtok.index')
+    parser.add_argument('--buffer-size', metavar='CHARS', type=int, default=STREAM_BUFFER_SIZE,
+                        help='when reading from STDIN in multi-line mode, segment and print '
+                             'the text buffered up to an empty line or at most this many '
+                             'characters [%(default)d]')
     mode = parser.add_mutually_exclusive_group()
     parser.set_defaults(mode=single)
     mode.add_argument('--single', '-s', action='store_const', dest='mode', const=single,
@@ -437,8 +978,37 @@ def main():
                       help=split_multi.__doc__)
 
     args = parser.parse_args()
+
+    if args.resume and not args.output_dir:
+        parser.error('--resume requires --output-dir')
+    elif args.resume and args.index:
+        parser.error('--index cannot be combined with --resume')
+    elif args.output_dir and not args.files and args.mode == multi and not args.with_ids:
+        parser.error('--output-dir with STDIN input requires --single or --with-ids')
+
     pattern = [DO_NOT_CROSS_LINES, MAY_CROSS_ONE_LINE, ][args.mode]
     normal = to_unix_linebreaks if args.normal_breaks else lambda t: t
+    encoding = args.encoding or 'utf-8'
+    inputs = corpus.expand_inputs(args.files)
+    manifest = corpus.Manifest(args.output_dir) if args.resume else None
+    stats = None
+    index = None
+    progress = None
+
+    if args.profile:
+        from .profiling import Stats
+        stats = Stats()
+
+    if args.index:
+        from .index import IndexWriter
+        index = IndexWriter(args.index)
+
+    if args.progress is not None or args.stats_json:
+        from .profiling import Progress
+        total = sum(path.getsize(p) for p, _ in inputs if manifest is None or not manifest.finished(p))
+        progress = Progress(None if args.progress is None else stderr, total,
+                            PROGRESS_INTERVAL if args.progress is None else args.progress,
+                            timed=bool(args.stats_json))
 
     # fix broken Unicode handling in Python 2.x
     # see http://www.macfreek.nl/memory/Encoding_of_Python_stdout
@@ -459,30 +1029,59 @@ def main():
             stderr.write('wrapped segmenter stdio with UTF-8 de/encoders')
             stderr.write(linesep)
 
-    if not args.files and args.mode != single:
-        parser.error('only single line splitting mode allowed '
-                     'when reading from STDIN')
+    def indexed(items_with_spans, found=None):
+        # the rewritten (intervening, sentence) pairs are the items with a span; the (non-empty)
+        # sentence spans are passed to `found`, if given, and collected if they are indexed
+        if index is None and found is None:
+            for item in utils.without_spans(items_with_spans):
+                yield item
 
-    def segment(text):
-        if not args.files and args.with_ids:
-            tid, text = text.split('\t', 1)
-        else:
-            tid = None
+            return
+
+        spans = None if index is None else []
+        count = 0
+
+        for item, span in items_with_spans:
+            if span is not None:
+                if count % 2 and span[0] != span[1]:
+                    if spans is not None:
+                        spans.append(span)
+
+                    if found is not None:
+                        found(span)
+
+                count += 1
+
+            yield item
+
+        if index is not None:
+            index.add(spans)
+
+    def segment(text, out, tid=None):
+        # returns the number of sentences
+        spans = []
 
         if args.mode == single:
-            sentences = utils.without_spans(split_single(normal(text), short_sentence_length=args.bracket_spans))
-            text_spans = [i for s in sentences for i in (s, '\n')]
+            sentences = split_single(normal(text), short_sentence_length=args.bracket_spans,
+                                     stats=stats, budget=args.budget, language=args.lang)
+
+            if index is not None:
+                index.add(span for s, span in sentences if s)
+
+            text_spans = [i for s in utils.without_spans(sentences) for i in (s, '\n')]
+            spans = sentences
         else:
-            text_spans = utils.without_spans(rewrite_line_separators(
-                normal(text), pattern, short_sentence_length=args.bracket_spans
-            ))
+            text_spans = indexed(rewrite_line_separators(
+                normal(text), pattern, short_sentence_length=args.bracket_spans, stats=stats,
+                budget=args.budget, language=args.lang
+            ), None if progress is None else spans.append)
 
         if tid is not None:
             def write_ids(tid, sid):
-                stdout.write(tid)
-                stdout.write('\t')
-                stdout.write(str(sid))
-                stdout.write('\t')
+                out.write(tid)
+                out.write('\t')
+                out.write(str(sid))
+                out.write('\t')
 
             last = '\n'
             sid = 1
@@ -492,23 +1091,84 @@ def main():
                     write_ids(tid, sid)
                     sid += 1
 
-                stdout.write(span)
+                out.write(span)
 
                 if span:
                     last = span
         else:
             for span in text_spans:
-                stdout.write(span)
-
-    if args.files:
-        for txt_file_path in args.files:
-            with codecs.open(
-                txt_file_path, 'r', encoding=(args.encoding or 'utf-8')
-            ) as fp:
-                segment(fp.read())
+                out.write(span)
+
+        return len(spans)
+
+    def segment_document(text, out):
+        # returns the number of documents (for the manifest)
+        start = None if progress is None else progress.clock()
+
+        if not args.files and args.with_ids:
+            tid, text = text.split('\t', 1)
+        else:
+            tid = None
+
+        sentences = segment(text, out, tid)
+
+        if progress is not None:
+            progress.add(len(text), sentences, start=start, doc_id=tid)
+
+        return 1
+
+    def counted(lines):
+        for line in lines:
+            progress.add(len(line), documents=0)
+            yield line
+
+    if args.files and args.output_dir:
+        try:
+            corpus.write_shards(inputs, segment_document, args.output_dir, encoding, args.readers,
+                                manifest, progress)
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.files:
+        texts = corpus.read_texts([p for p, _ in inputs], encoding, args.readers)
+
+        for _, text in texts if progress is None else progress.track(texts):
+            segment_document(text, stdout)
+    elif args.output_dir:
+        key = (lambda line: line.split('\t', 1)[0]) if args.with_ids else None
+        corpus.write_stdin_shards(stdin, segment_document, args.output_dir, encoding, args.shard_size,
+                                  manifest, key)
+    elif args.mode == multi and not args.with_ids:
+        lines = (normal(line) for line in (stdin if progress is None else counted(stdin)))
+        found = None if progress is None else lambda span: progress.add(0, 1, documents=0)
+        text_spans = indexed(rewrite_line_separators_stream(
+            lines, pattern, short_sentence_length=args.bracket_spans, stats=stats,
+            budget=args.budget, buffer_size=args.buffer_size, language=args.lang
+        ), found)
+
+        for span in text_spans:
+            stdout.write(span)
+
+        if progress is not None:
+            progress.add(0)  # the stream is one document
     else:
         for line in stdin:
-            segment(line)
+            segment_document(line, stdout)
+
+    if index is not None:
+        index.close()
+
+    if manifest is not None:
+        manifest.close()
+
+    if stats is not None:
+        stderr.write(stats.summary())
+        stderr.write(linesep)
+
+    if progress is not None:
+        progress.report(force=True)
+
+        if args.stats_json:
+            corpus.write_json(progress.summary(), args.stats_json)
 
 
 if __name__ == '__main__':
@@ -1,9 +1,10 @@
 # coding=utf-8
 from __future__ import absolute_import, division, unicode_literals
 from unittest import TestCase
-from segtok.segmenter import split_single, split_multi, MAY_CROSS_ONE_LINE, \
-    split_newline, rewrite_line_separators, ABBREVIATIONS, CONTINUATIONS, \
-    NON_UNIX_LINEBREAK, to_unix_linebreaks
+from segtok.segmenter import split_single, split_multi, split_multi_parallel, MAY_CROSS_ONE_LINE, \
+    split_newline, rewrite_line_separators, rewrite_line_separators_stream, ABBREVIATIONS, CONTINUATIONS, \
+    NON_UNIX_LINEBREAK, to_unix_linebreaks, BEFORE_LOWER, UPPER_CASE_END, LANGUAGES, language_profile
+from segtok.profiling import Stats
 from . import span_utils
 
 
@@ -116,6 +117,20 @@ class TestSentenceSegmenter(TestCase):
         for example in ('to be', 'Are those', 'not and'):
             self.assertTrue(CONTINUATIONS.search(example) is None, example)
 
+    def test_BEFORE_LOWER_tail(self):
+        for example in ('He said "Hello!" ', 'in the U.S.A. ', 'of m. ', 'x (see here.) ', 'A. ' * 1000):
+            self.assertTrue(BEFORE_LOWER.match(example) is not None, example)
+
+        for example in ('A. but not here. ', 'the end.', 'Hello!  x'):
+            self.assertTrue(BEFORE_LOWER.match(example) is None, example)
+
+    def test_UPPER_CASE_END_tail(self):
+        for example in ('Proc. ', 'in Biochem. J. ', 'Acad.\n'):
+            self.assertTrue(UPPER_CASE_END.match(example) is not None, repr(example))
+
+        for example in ('Proc. Natl', 'in biochem. ', 'Proc.'):
+            self.assertTrue(UPPER_CASE_END.match(example) is None, example)
+
     def test_NON_UNIX_LINEBREAK_search(self):
         for example in ('\r', '\r\n', '\u2028'):
             self.assertTrue(NON_UNIX_LINEBREAK.search(example) is not None, repr(example))
@@ -221,6 +236,23 @@ class TestSentenceSegmenter(TestCase):
         result = self.rewrite_line_separators(a_text, MAY_CROSS_ONE_LINE)
         self.assertSequenceEqual(OSPL, ''.join(result))
 
+    def test_rewrite_stream(self):
+        text = '\n\n'.join([OSPL, TEXT, "and this continues.\nOver (two\n\nparagraphs) here.", OSPL] * 2)
+        expected = list(rewrite_line_separators(text, MAY_CROSS_ONE_LINE))
+        lines = text.splitlines(True)
+        self.assertSequenceEqual(expected, list(rewrite_line_separators_stream(lines, MAY_CROSS_ONE_LINE)))
+        self.assertSequenceEqual(expected, list(rewrite_line_separators_stream(lines, MAY_CROSS_ONE_LINE,
+                                                                               buffer_size=1)))
+
+    def test_rewrite_stream_without_terminals(self):
+        lines = ['line %d without a terminal\n' % i for i in range(5000)]
+        expected = list(rewrite_line_separators(''.join(lines), MAY_CROSS_ONE_LINE))
+        stats = Stats()
+        self.assertSequenceEqual(expected, list(rewrite_line_separators_stream(
+            lines, MAY_CROSS_ONE_LINE, stats=stats, buffer_size=100
+        )))
+        self.assertLess(stats.calls['split'], 20)
+
     def test_newline_spans(self):
         self.assertSequenceEqual(SPAN_TEST_ANSWER, list(split_newline(SPAN_TEST_TEXT)))
 
@@ -229,3 +261,63 @@ class TestSentenceSegmenter(TestCase):
 
     def test_multi_spans(self):
         self.assertSequenceEqual(SPAN_TEST_ANSWER, list(split_multi(SPAN_TEST_TEXT)))
+
+    def test_stats(self):
+        stats = Stats()
+        sentences = ["This is Mr. Smith.", "And the U.S. Air Force is there."]
+        self.assertSequenceEqual(split_single(' '.join(sentences)), split_single(' '.join(sentences), stats=stats))
+        self.assertEqual(2, stats.counts['join: ABBREVIATIONS'])
+        self.assertEqual(1, stats.counts['split'])
+        self.assertEqual(1, stats.calls['split'])
+        self.assertGreater(stats.calls['SEGMENT_END'], 0)
+
+    def test_budget(self):
+        stats = Stats()
+        text = "This is Mr. Smith. He is here.\nAnd there."
+        self.assertSequenceEqual(split_single(text), split_single(text, budget=10))
+        self.assertSequenceEqual(list(split_newline(text)), split_multi(text, budget=0, stats=stats))
+        self.assertEqual(1, stats.counts['budget exceeded: split_multi'])
+
+    def test_without_terminals(self):
+        self.assertSequenceEqual([("A title", (2, 9))], split_single("  A title "))
+        self.assertSequenceEqual([("A title", (2, 9))], list(split_multi("  A title ")))
+        self.assertSequenceEqual([], split_single(" \t"))
+        self.assertSequenceEqual([("", (0, 0))], list(split_multi("")))
+
+    def test_multi_parallel(self):
+        text = '\n\n'.join([OSPL, TEXT, "and this continues.\nOver (two\n\nparagraphs) here.", OSPL] * 3)
+        expected = list(split_multi(text))
+        self.assertSequenceEqual(expected, split_multi_parallel(text, processes=2, chunk_size=100))
+        self.assertSequenceEqual(expected, split_multi_parallel(text, processes=2, chunk_size=1))
+        self.assertSequenceEqual(expected, split_multi_parallel(text, processes=2))
+
+    def test_multi_parallel_threads(self):
+        text = '\n\n'.join([OSPL, TEXT, "and this continues.\nOver (two\n\nparagraphs) here.", OSPL] * 3)
+        expected = list(split_multi(text))
+        self.assertSequenceEqual(expected, split_multi_parallel(text, chunk_size=100, threads=3))
+
+    def test_languages(self):
+        german = ["Dr. med. Meier kam am 3. Mai zur Arbeit.", "Er ging z.B. nach Hause.",
+                  "Er lief. und dann"]
+        spanish = ["La Sra. Y. Ruiz vino el 3. Ago.", "Fue con el Dr. Vega."]
+        english = ["He met Mr. Smith by J. Watt.", "Then he left. and so on."]
+        self.assertSequenceEqual(german[:2] + [' '.join(german[2:])],
+                                 [s for s, _ in split_single(' '.join(german), language='de')])
+        self.assertSequenceEqual(spanish, [s for s, _ in split_single(' '.join(spanish), language='es')])
+        self.assertSequenceEqual(english, [s for s, _ in split_single(' '.join(english), language='en')])
+        self.assertSequenceEqual(["He met Mr.", "Smith by J.", "Watt."],
+                                 [s for s, _ in split_single(' '.join(english[:1]), language='generic')])
+
+    def test_language_profile(self):
+        for language in LANGUAGES:
+            self.assertIs(language_profile(language), language_profile(language))
+
+        self.assertIs(ABBREVIATIONS, language_profile(None)['ABBREVIATIONS'])
+        self.assertIs(CONTINUATIONS, language_profile(None)['CONTINUATIONS'])
+        self.assertRaises(ValueError, split_multi, "Text.", language='xx')
+
+    def test_multi_parallel_language(self):
+        text = '\n\n'.join([OSPL, TEXT] * 3)
+        expected = list(split_multi(text, language='en'))
+        self.assertSequenceEqual(expected, split_multi_parallel(text, chunk_size=100, threads=2,
+                                                                language='en'))
@@ -1,8 +1,50 @@
+from array import array
+import sys
+
+OFFSET_TYPE = 'I'
+"The array type code used to pack span offsets: unsigned, 4 bytes on all platforms."
+
+assert array(OFFSET_TYPE).itemsize == 4
+
+
 def make_sub(outer_with_span, inner_with_span):
     outer_text, outer_span = outer_with_span
     inner_text, inner_span = inner_with_span
     return inner_text, (outer_span[0] + inner_span[0], outer_span[0] + inner_span[1])
 
+def pack_spans(spans):
+    """
+    Serialize a sequence of ``(start, end)`` spans to a compact byte string that is the same
+    on all platforms (little-endian, 4-byte offsets).
+    """
+    offsets = array(OFFSET_TYPE)
+
+    for start, end in spans:
+        offsets.append(start)
+        offsets.append(end)
+
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+
+    if not hasattr(offsets, 'tobytes'):  # Python 2
+        return offsets.tostring()
+
+    return offsets.tobytes()
+
+def unpack_spans(data):
+    """Deserialize a byte string created by :func:`pack_spans` back into a list of spans."""
+    offsets = array(OFFSET_TYPE)
+
+    if hasattr(offsets, 'frombytes'):
+        offsets.frombytes(data)
+    else:  # Python 2
+        offsets.fromstring(data)
+
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+
+    return list(zip(offsets[::2], offsets[1::2]))
+
 def test_sequencer_with_spans(tester, sequencer, normalize_token=lambda x: x, normalize_original=lambda x: x):
     """
     Wrap a function that provides a sequence of items with spans to work as a regular spanless sequence, and also test that its token values match the values its spans give in the original text.
@@ -3,21 +3,13 @@
 Regex-based word tokenizers.
 
 Note that small/full/half-width character variants are *not* covered.
-If a text were to contains such characters, normalize it first.
+If a text were to contains such characters, normalize it first;
+:func:`segtok.normalizer.normalize` does so while keeping a map back to the original offsets.
 """
 from __future__ import absolute_import, unicode_literals
 import codecs
-try:
-    from html import unescape
-except ImportError:
-    # Python <= 3.3 doesn't have html.unescape
-    try:
-        from html.parser import HTMLParser
-    except ImportError:
-        # Python 2.x
-        from HTMLParser import HTMLParser
-    unescape = HTMLParser().unescape
-from cgi import escape
+from collections import deque
+from timeit import default_timer
 
 from regex import compile, UNICODE, VERBOSE
 
@@ -30,6 +22,9 @@ except ImportError:
 
 from . import re_utils
 from . import span_utils
+from .normalizer import unescape, unescape_entities
+from .profiling import report_timeout
+from .tokens import TokenArray
 
 
 __author__ = 'Florian Leitner <florian.leitner@gmail.com>'
@@ -66,6 +61,9 @@ SPACE = r'[\p{Zs}\t]'
 APO_MATCHER = compile(APOSTROPHE, UNICODE)
 """Matcher for any apostrophe."""
 
+NON_SPACE = compile(r'\S+', UNICODE)
+"""Matcher for runs of non-space characters."""
+
 HYPHENATED_LINEBREAK = compile(
     r'({alnum}{hyphen}){space}*?{linebreak}{space}*?({alnum})'.format(
         alnum=ALNUM, hyphen=HYPHEN, linebreak=LINEBREAK, space=SPACE
@@ -90,6 +88,9 @@ IS_CONTRACTION = compile(r"{alnum}+(?:{hyphen}{alnum}+)*{apo}(?:d|ll|m|re|s|t|ve
 )
 """A pattern that matches tokens with valid English contractions ``'(d|ll|m|re|s|t|ve)``."""
 
+PARALLEL_CHUNK_SIZE = 256
+"""The number of sentences per task that :func:`tokenize_parallel` hands to a thread."""
+
 
 def split_possessive_markers(tokens):
     """
@@ -102,9 +103,15 @@ def split_possessive_markers(tokens):
     >>> split_possessive_markers(word_tokenizer(my_sentence))
     ['This', 'is', 'Fred', "'s", 'latest', 'book', '.']
 
-    :param tokens: a list of tokens
+    A :class:`segtok.tokens.TokenArray` (from ``as_array=True``) is split into a new array;
+    split the tokens before encoding them with a vocabulary, though.
+
+    :param tokens: a list of tokens or an unencoded token array
     :returns: an updated list if a split was made or the original list otherwise
     """
+    if isinstance(tokens, TokenArray):
+        return _split_array(split_possessive_markers, tokens)
+
     idx = -1
 
     for token_text, token_span in list(tokens):
@@ -129,9 +136,15 @@ def split_contractions(tokens_with_spans):
 
     Takes the output of any of the tokenizer functions and produces and updated list.
 
-    :param tokens: a list of tokens
+    A :class:`segtok.tokens.TokenArray` (from ``as_array=True``) is split into a new array;
+    split the tokens before encoding them with a vocabulary, though.
+
+    :param tokens: a list of tokens or an unencoded token array
     :returns: an updated list if a split was made or the original list otherwise
     """
+    if isinstance(tokens_with_spans, TokenArray):
+        return _split_array(split_contractions, tokens_with_spans)
+
     idx = -1
 
     for token_text, token_span in list(tokens_with_spans):
@@ -153,6 +166,14 @@ def split_contractions(tokens_with_spans):
     return tokens_with_spans
 
 
+def _split_array(split, tokens):
+    """Apply the list `split` function to the token array `tokens` and return a new array."""
+    if tokens.ids is not None:
+        raise ValueError('the tokens have already been encoded')
+
+    return TokenArray.from_tokens(tokens.source, split(list(tokens)))
+
+
 def _matches(regex):
     """Regular expression compiling function decorator."""
     def match_decorator(fn):
@@ -166,28 +187,35 @@ def _matches(regex):
 
 
 @_matches(r'\s+')
-def space_tokenizer(sentence):
+def space_tokenizer(sentence, as_array=False, vocabulary=None):
     """
     For a given input `sentence`, return a list of its tokens.
 
     Split on Unicode spaces ``\\s+`` (i.e., any kind of **Unicode** space character).
     The separating space characters are not included in the resulting token list.
+    With `as_array`, the tokens are returned as a :class:`segtok.tokens.TokenArray`;
+    with a `vocabulary` (see :mod:`segtok.vocabulary`), that array also holds the token IDs.
     """
+    if as_array or vocabulary is not None:
+        return _result(sentence, iter_space_tokenizer(sentence), as_array, vocabulary)
+
     return [token_with_span for token_with_span in re_utils.split_with_spans(space_tokenizer.regex, sentence) if token_with_span[0] != ""]
 
 
-@_matches(r'(%s+)' % ALNUM)
-def symbol_tokenizer(sentence):
+@_matches(r'%s+ | [^\s%s]+' % (ALNUM, ALNUM[1:-1]))
+def symbol_tokenizer(sentence, as_array=False, vocabulary=None):
     """
     The symbol tokenizer extends the :func:`space_tokenizer` by separating alphanumerics.
 
     Separates alphanumeric Unicode character sequences in already space-split tokens.
+    With `as_array`, the tokens are returned as a :class:`segtok.tokens.TokenArray`;
+    with a `vocabulary` (see :mod:`segtok.vocabulary`), that array also holds the token IDs.
     """
-    return [span_utils.make_sub((span_text, span_span), token_with_span)
-            for span_text, span_span in space_tokenizer(sentence)
-            for token_with_span in re_utils.split_with_spans(symbol_tokenizer.regex, span_text)
-            if token_with_span[0] != ""
-        ]
+    # a single scan for alphanumeric runs and runs of other non-space characters
+    if as_array or vocabulary is not None:
+        return _result(sentence, iter_symbol_tokenizer(sentence), as_array, vocabulary)
+
+    return [(match.group(), match.span()) for match in symbol_tokenizer.regex.finditer(sentence)]
 
 
 @_matches(r"""((?:
@@ -204,10 +232,10 @@ def symbol_tokenizer(sentence):
     | # ASCII single quote, surrounded by digits or letters (no dangling allowed)
     {alnum} ' (?={alnum})
     | # ASCII single quote after an s and at the token's end
-    s ' $
+    s ' (?!\S)
     | # Terminal dimensions (superscript minus, 1, 2, and 3) attached to physical units
     #  size-prefix                 unit-acronym    dimension
-    \b [yzafpn\u00B5mcdhkMGTPEZY]? {letter}{{1,3}} {power} $
+    \b [yzafpn\u00B5mcdhkMGTPEZY]? {letter}{{1,3}} {power} (?!\S)
     | # Atom counts (subscript numbers) and ionization states (optional superscript
     #   2 or 3 followed by a + or -) are attached to valid fragments of a chemical formula
     \b (?:[A-Z][a-z]?|[\)\]])+ {subdigit}+ (?:[\u00B2\u00B3]?[\u207A\u207B])?
@@ -215,7 +243,7 @@ def symbol_tokenizer(sentence):
     {alnum}
     )+)""".format(alnum=ALNUM, apo=APOSTROPHE, power=POWER, subdigit=SUBDIGIT,
                   hyphen=HYPHEN, letter=LETTER, number=NUMBER))
-def word_tokenizer(sentence):
+def word_tokenizer(sentence, stats=None, budget=None, as_array=False, vocabulary=None):
     """
     This tokenizer extends the alphanumeric :func:`symbol_tokenizer` by splitting fewer cases:
 
@@ -240,33 +268,89 @@ def word_tokenizer(sentence):
        word if it is no longer than 3 letters (optionally 4 if the first letter is a power prefix
        in the range from yocto, y (10^-24) to yotta, Y (10^+24)).
     6. Subscript digits are attached if prefixed with letters that look like a chemical formula.
+
+    If a :class:`segtok.profiling.Stats` instance is given as `stats`, the time spent in the
+    regex split, the terminal splicing, and the dangling punctuation loop is recorded, as are
+    the post-processing paths that fired.
+    If the time `budget` (in seconds) is exceeded, the sentence is only split at spaces.
+    With `as_array`, the tokens are returned as a :class:`segtok.tokens.TokenArray`;
+    with a `vocabulary` (see :mod:`segtok.vocabulary`), that array also holds the token IDs.
+    """
+    if budget is not None:
+        return _result(sentence, _within_budget('word_tokenizer', sentence, budget, stats,
+                                                lambda deadline: _word_tokens(sentence, stats, deadline)),
+                       as_array, vocabulary)
+
+    if stats is None and (as_array or vocabulary is not None):
+        return _result(sentence, iter_word_tokenizer(sentence), as_array, vocabulary)
+
+    return _result(sentence, _word_tokens(sentence, stats), as_array, vocabulary)
+
+
+def _word_tokens(sentence, stats=None, deadline=None):
+    if stats is not None:
+        start = default_timer()
+
+    pruned, pruned_spans = _prune(sentence, deadline)
+    tokens_with_spans = list(_unprune(_word_runs(pruned, re_utils.time_left(deadline)), pruned_spans))
+
+    if stats is not None:
+        start = stats.lap('word split', start)
+
+        if pruned_spans:
+            stats.count('hyphenated linebreak', len(pruned_spans))
+
+    _splice_terminal(tokens_with_spans, stats)
+
+    if stats is not None:
+        start = stats.lap('terminal', start)
+
+    # splice off any dangling commas and (semi-) colons
+    tokens_with_spans = [token_with_span for word_with_span in tokens_with_spans
+                         for token_with_span in _splice_dangling(word_with_span, stats)]
+
+    if stats is not None:
+        stats.lap('dangling', start)
+
+    return tokens_with_spans
+
+
+def _prune(sentence, deadline=None):
+    """
+    Join the words at any hyphenated linebreaks in the `sentence` and return the pruned text
+    together with the list of the pruned ``(start, end)`` spans of the `sentence`.
     """
     pruned_spans = []
+
     def prune(match):
         pruned_spans.append((match.end(1), match.start(2)))
         return match.group(1) + match.group(2)
-    pruned = HYPHENATED_LINEBREAK.sub(prune, sentence)
-
-    prune_shift = [(0, 0)]
-    def make_token(span_with_span, token_with_span):
-        span_text, span_span = span_with_span
-        token_text, token_span = token_with_span
-        shift_dist, next_prune = prune_shift[-1]
-        abs_start = span_span[0] + token_span[0] + shift_dist
-        abs_end = span_span[0] + token_span[1] + shift_dist
+
+    return HYPHENATED_LINEBREAK.sub(prune, sentence, timeout=re_utils.time_left(deadline)), pruned_spans
+
+
+def _unprune(tokens_with_spans, pruned_spans):
+    """Shift the spans of the tokens in the pruned text (see :func:`_prune`) back to the sentence."""
+    shift_dist, next_prune = 0, 0
+
+    for token_text, token_span in tokens_with_spans:
+        abs_start = token_span[0] + shift_dist
+        abs_end = token_span[1] + shift_dist
+
         if next_prune < len(pruned_spans) and pruned_spans[next_prune][0] < abs_end:
             shift_dist_change = pruned_spans[next_prune][1] - pruned_spans[next_prune][0]
-            prune_shift.append((shift_dist + shift_dist_change, next_prune + 1))
+            shift_dist += shift_dist_change
+            next_prune += 1
             abs_end += shift_dist_change
-        return token_text, (abs_start, abs_end)
-    tokens_with_spans = [make_token(span_with_span, token_with_span)
-                for span_with_span in space_tokenizer(pruned)
-                for token_with_span in re_utils.split_with_spans(word_tokenizer.regex, span_with_span[0])
-                if token_with_span[0] != ""
-            ]
 
-    # splice the sentence terminal off the last word/token if it has any at its borders
-    # only look for the sentence terminal in the last three tokens
+        yield token_text, (abs_start, abs_end)
+
+
+def _splice_terminal(tokens_with_spans, stats=None):
+    """
+    Splice the sentence terminal off the last word/token if it has any at its borders;
+    only looks for the sentence terminal in the last three tokens of the list (in place).
+    """
     for idx, (word, span) in enumerate(reversed(tokens_with_spans[-3:]), 1):
         if (word_tokenizer.match(word) and not APO_MATCHER.match(word)) or \
                 any(t in word for t in SENTENCE_TERMINALS):
@@ -279,31 +363,62 @@ def word_tokenizer(sentence):
                 # "stuff."
                 tokens_with_spans[-idx] = (word[:-1], (span[0], span[1] - 1))
                 tokens_with_spans.insert(len(tokens_with_spans) - idx + 1, (word[-1], (span[1] - 1, span[1])))
+
+                if stats is not None:
+                    stats.count('terminal: suffix')
             elif any(word.find(t) == 0 for t in SENTENCE_TERMINALS):
                 # ".stuff"
                 tokens_with_spans[-idx] = (word[0], (span[0], span[0] + 1))
                 tokens_with_spans.insert(len(tokens_with_spans) - idx, (word[:-1], (span[0], span[1] - 1)))
 
+                if stats is not None:
+                    stats.count('terminal: prefix')
+
             break
 
-    # keep splicing off any dangling commas and (semi-) colons
-    dirty = True
-    while dirty:
-        dirty = False
-
-        for idx, (word, span) in enumerate(reversed(tokens_with_spans), 1):
-            while len(word) > 1 and word[-1] in u',;:':
-                char = word[-1]  # the dangling comma/colon
-                word = word[:-1]
-                span = span[0], span[1] - 1
-                tokens_with_spans[-idx] = (word, span)
-                tokens_with_spans.insert(len(tokens_with_spans) - idx + 1, (char, (span[1], span[1] + 1)))
-                idx += 1
-                dirty = True
-            if dirty:
-                break  # restart check to avoid index errors
 
-    return tokens_with_spans
+def _splice_dangling(word_with_span, stats=None):
+    """Generate the word without any dangling commas and (semi-) colons, and then those."""
+    word, (start, end) = word_with_span
+    length = len(word)
+    cut = length
+
+    while cut > 1 and word[cut - 1] in u',;:':
+        cut -= 1
+
+    if cut == length:
+        yield word_with_span
+        return
+
+    if stats is not None:
+        stats.count('dangling punctuation', length - cut)
+
+    offset = end - length
+    yield word[:cut], (start, end - length + cut)
+
+    for pos in range(cut, length):
+        yield word[pos], (offset + pos, offset + pos + 1)
+
+
+def _word_runs(text, timeout=None):
+    """
+    Scan the `text` once for the word pattern's runs and split the non-space characters
+    between them at spaces, generating the tokens with their spans.
+    """
+    last = 0
+
+    for match in word_tokenizer.regex.finditer(text, timeout=timeout):
+        start, end = match.span()
+
+        if last < start:
+            for gap in NON_SPACE.finditer(text, last, start):
+                yield gap.group(), gap.span()
+
+        yield match.group(), (start, end)
+        last = end
+
+    for gap in NON_SPACE.finditer(text, last):
+        yield gap.group(), gap.span()
 
 
 @_matches(r"""
@@ -327,30 +442,211 @@ def word_tokenizer(sentence):
 
     )(?=[\s>"')\]}]|$)            # visual border
     """)
-def web_tokenizer(sentence):
+def web_tokenizer(sentence, stats=None, budget=None, as_array=False, vocabulary=None):
     """
     The web tokenizer works like the :func:`word_tokenizer`, but does not split URIs or
     e-mail addresses. It also un-escapes all escape sequences (except in URIs or email addresses).
+
+    If a :class:`segtok.profiling.Stats` instance is given as `stats`, the URI/e-mail matching,
+    the un-escaping, and the re-alignment of the token spans are timed, too.
+    If the time `budget` (in seconds) is exceeded, the sentence is only split at spaces.
+    With `as_array`, the tokens are returned as a :class:`segtok.tokens.TokenArray`;
+    with a `vocabulary` (see :mod:`segtok.vocabulary`), that array also holds the token IDs.
     """
-    def fix_regular_tokens(tokens_with_spans):
-        offset = 0
-        for token_text, token_span in tokens_with_spans:
-            token_span = offset + token_span[0], offset + token_span[1]
-            orig_token_text = sentence[token_span[0]:token_span[1]]
-            if orig_token_text != token_text:
-                escaped_token_text = escape(token_text)
-                escaped_token_span = token_span[0], token_span[0] + len(escaped_token_text)
-                if sentence[escaped_token_span[0]:escaped_token_span[1]] == escaped_token_text:
-                    offset += len(escaped_token_text) - len(token_text)
-                    token_span = escaped_token_span
-            yield token_text, token_span
-    return [token_with_span
-            for i, (span_text, span_span) in enumerate(re_utils.split_with_spans(web_tokenizer.regex, sentence))
-            for token_with_span in (
-                    ((span_text, span_span),) if i % 2
-                    else fix_regular_tokens(span_utils.make_sub((span_text, span_span), t_w_s) for t_w_s in word_tokenizer(unescape(span_text)))
-                )
-        ]
+    if budget is not None:
+        return _result(sentence, _within_budget('web_tokenizer', sentence, budget, stats,
+                                                lambda deadline: _web_tokens(sentence, stats, deadline)),
+                       as_array, vocabulary)
+
+    if stats is None and (as_array or vocabulary is not None):
+        return _result(sentence, iter_web_tokenizer(sentence), as_array, vocabulary)
+
+    return _result(sentence, _web_tokens(sentence, stats), as_array, vocabulary)
+
+
+def _web_tokens(sentence, stats=None, deadline=None):
+    if '@' not in sentence and '://' not in sentence:  # no URI or e-mail address possible
+        return _unescaped_tokens(sentence, (0, len(sentence)), stats, deadline)
+
+    if stats is None:
+        return [token_with_span
+                for i, (span_text, span_span) in enumerate(re_utils.split_with_spans(
+                    web_tokenizer.regex, sentence, re_utils.time_left(deadline)
+                ))
+                for token_with_span in (
+                        ((span_text, span_span),) if i % 2
+                        else _unescaped_tokens(span_text, span_span, deadline=deadline)
+                    )
+            ]
+
+    start = default_timer()
+    spans = list(re_utils.split_with_spans(web_tokenizer.regex, sentence, re_utils.time_left(deadline)))
+    start = stats.lap('uri split', start)
+    tokens_with_spans = []
+
+    for i, (span_text, span_span) in enumerate(spans):
+        if i % 2:
+            stats.count('uri or e-mail')
+            tokens_with_spans.append((span_text, span_span))
+            continue
+
+        tokens_with_spans.extend(_unescaped_tokens(span_text, span_span, stats, deadline))
+
+    return tokens_with_spans
+
+
+def _unescaped_tokens(span_text, span_span, stats=None, deadline=None):
+    """
+    Word-tokenize the un-escaped `span_text` and map the token spans back to the escaped text
+    at the `span_span` of the sentence.
+    """
+    if stats is not None:
+        start = default_timer()
+
+    unescaped, offsets = unescape_entities(span_text)
+
+    if stats is not None:
+        start = stats.lap('unescape', start)
+
+        if unescaped != span_text:
+            stats.count('unescape: changed')
+
+    words = _word_tokens(unescaped, stats, deadline)
+
+    if stats is not None:
+        start = default_timer()
+
+    if len(offsets):
+        words = offsets.spans(words)
+
+    tokens_with_spans = [span_utils.make_sub((span_text, span_span), t_w_s) for t_w_s in words]
+
+    if stats is not None:
+        stats.lap('realign', start)
+
+    return tokens_with_spans
+
+
+def iter_space_tokenizer(sentence):
+    """Generate the tokens with their spans of the :func:`space_tokenizer`, one by one."""
+    for token_with_span in re_utils.split_with_spans(space_tokenizer.regex, sentence):
+        if token_with_span[0] != "":
+            yield token_with_span
+
+
+def iter_symbol_tokenizer(sentence):
+    """Generate the tokens with their spans of the :func:`symbol_tokenizer`, one by one."""
+    for match in symbol_tokenizer.regex.finditer(sentence):
+        yield match.group(), match.span()
+
+
+def iter_word_tokenizer(sentence):
+    """
+    Generate the tokens with their spans of the :func:`word_tokenizer`, one by one.
+
+    Only the last three words are held back, until the sentence terminal has been found.
+    """
+    pruned, pruned_spans = _prune(sentence)
+    window = deque()
+
+    for word_with_span in _unprune(_word_runs(pruned), pruned_spans):
+        window.append(word_with_span)
+
+        if len(window) > 3:
+            for token_with_span in _splice_dangling(window.popleft()):
+                yield token_with_span
+
+    window = list(window)
+    _splice_terminal(window)
+
+    for word_with_span in window:
+        for token_with_span in _splice_dangling(word_with_span):
+            yield token_with_span
+
+
+def iter_web_tokenizer(sentence):
+    """Generate the tokens with their spans of the :func:`web_tokenizer`, one by one."""
+    for i, (span_text, span_span) in enumerate(re_utils.split_with_spans(web_tokenizer.regex, sentence)):
+        if i % 2:
+            yield span_text, span_span
+            continue
+
+        unescaped, offsets = unescape_entities(span_text)
+        words = iter_word_tokenizer(unescaped)
+
+        if len(offsets):
+            words = offsets.spans(words)
+
+        for token_with_span in words:
+            yield span_utils.make_sub((span_text, span_span), token_with_span)
+
+
+def _result(sentence, tokens_with_spans, as_array, vocabulary):
+    """
+    Return the tokens of the `sentence` as they are, or as a :class:`segtok.tokens.TokenArray`,
+    with their IDs if a `vocabulary` is given.
+
+    To build an array, `tokens_with_spans` may be a generator (see the ``iter_*`` tokenizers)
+    that is consumed straight into the array's offset and ID columns, without first collecting
+    the tokens in a list.
+    """
+    if as_array or vocabulary is not None:
+        return TokenArray.from_tokens(sentence, tokens_with_spans, vocabulary)
+
+    return tokens_with_spans
+
+
+def _within_budget(name, sentence, budget, stats, tokenize):
+    """
+    Run `tokenize` with a deadline `budget` seconds from now and return its tokens.
+
+    If the budget is exceeded, the time-out is reported and the sentence is split at spaces only.
+    """
+    try:
+        return tokenize(default_timer() + budget)
+    except re_utils.TimeoutError:
+        report_timeout(name, sentence, budget, stats)
+        return space_tokenizer(sentence)
+
+
+def tokenize_parallel(sentences, tokenizer=word_tokenizer, threads=None, chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    Generate the tokens of each of the `sentences` (any iterable), in order, tokenized by a
+    pool of `threads` (by default, one per CPU) in chunks of `chunk_size` sentences.
+
+    At most two chunks per thread are queued ahead of the consumer.
+    """
+    from multiprocessing import cpu_count
+    from multiprocessing.pool import ThreadPool
+    threads = threads or cpu_count()
+    pool = ThreadPool(threads)
+    pending = deque()
+    chunk = []
+
+    try:
+        for sentence in sentences:
+            chunk.append(sentence)
+
+            if len(chunk) == chunk_size:
+                pending.append(pool.apply_async(_tokenize_chunk, (tokenizer, chunk)))
+                chunk = []
+
+                if len(pending) >= 2 * threads:
+                    for tokens in pending.popleft().get():
+                        yield tokens
+
+        if chunk:
+            pending.append(pool.apply_async(_tokenize_chunk, (tokenizer, chunk)))
+
+        while pending:
+            for tokens in pending.popleft().get():
+                yield tokens
+    finally:
+        pool.terminate()
+
+
+def _tokenize_chunk(tokenizer, sentences):
+    return [tokenizer(sentence) for sentence in sentences]
 
 
 def main():
@@ -358,19 +654,21 @@ def main():
     from argparse import ArgumentParser
     from sys import argv, stdout, stdin, stderr, getdefaultencoding, version_info
     from os import path, linesep
-    from . import utils
+    from . import corpus
+    from .profiling import PROGRESS_INTERVAL
 
     def _tokenize(sentence, tokenizer):
-        sep = None
+        tokens = [token for token, _ in tokenizer(sentence)]
 
-        for token in utils.without_spans(tokenizer(sentence)):
-            if sep is not None:
-                stdout.write(sep)
+        if vocabulary is not None:
+            tokens = [str(i) for i in vocabulary.encode(tokens)]
 
-            stdout.write(token)
-            sep = ' '
+        return tokens
 
-        stdout.write(linesep)
+    def _split_ids(line):
+        # the ID and sentence number columns (with their tabs) and the sentence
+        sentence = line.split('\t', 2)[-1]
+        return line[:len(line) - len(sentence)], sentence
 
     NUM_TOKENIZERS = 4
     SPACE, ALNUM, TOKEN, WEB = list(range(NUM_TOKENIZERS))
@@ -385,12 +683,56 @@ def main():
                             epilog='default tokenizer: token; default encoding: ' +
                                    getdefaultencoding())
     parser.add_argument('files', metavar='FILE', nargs='*',
-                        help='One-Sentence-Per-Line file; if absent, read from STDIN')
+                        help='One-Sentence-Per-Line file(s), optionally compressed (.gz, .bz2, '
+                             '.xz), directories, or glob patterns; if absent, read from STDIN')
+    parser.add_argument('--output-dir', '-o', metavar='DIR',
+                        help='write the tokens of each input file to a file of the same '
+                             'name (without compression extension) in DIR')
+    parser.add_argument('--readers', metavar='N', type=int, default=1,
+                        help='number of threads reading and decompressing input files '
+                             'ahead of the tokenization; 0 reads them on demand [%(default)d]')
+    parser.add_argument('--shard-size', metavar='N', type=int, default=corpus.SHARD_SIZE,
+                        help='with --output-dir, write the output for STDIN to numbered '
+                             'shards of N sentences (and, with --resume, checkpoint the '
+                             'shards of input files every N sentences) [%(default)d]')
+    parser.add_argument('--resume', action='store_true',
+                        help='with --output-dir, record the finished shards in a manifest '
+                             'there and skip them when run again (skip the IDs and sentence '
+                             'numbers of finished shards if --with-ids is used, or else the '
+                             'number of lines); a cut-off input file resumes at its last '
+                             'checkpoint')
+    parser.add_argument('--with-ids', action='store_true',
+                        help='the input is ID-tab-N-tab-SENTENCE (as from the segmenter\'s '
+                             '--with-ids); the ID and N columns are preserved in the output '
+                             'as ID-tab-N-tab-TOKENS')
     parser.add_argument('--possessive-marker', '-p', action='store_true',  # TODO
                         help='split off the possessive marker from alphanumeric tokens')
     parser.add_argument('--split-contractions', '-c', action='store_true',  # TODO
                         help='split contractions like "don\'t" in alphanumeric tokens in two')
     parser.add_argument('--encoding', '-e', help='define encoding to use')
+    parser.add_argument('--budget', metavar='SECONDS', type=float,
+                        help='time budget per sentence for the token and web tokenizers; '
+                             'sentences that take longer are only split at spaces, and a '
+                             'warning is printed')
+    parser.add_argument('--profile', action='store_true',
+                        help='print post-processing paths and phase timings of the token and '
+                             'web tokenizers to STDERR when done')
+    parser.add_argument('--progress', metavar='SECONDS', type=float, nargs='?',
+                        const=PROGRESS_INTERVAL,
+                        help='report the sentences, tokens, and characters processed, the '
+                             'throughput, and (for input files) the remaining time to STDERR '
+                             'every SECONDS [%(const)s]')
+    parser.add_argument('--stats-json', metavar='PATH',
+                        help='write the totals, the timings per input file, and the slowest '
+                             'sentences (by ID and number, or by input name and line number) '
+                             'as JSON to PATH')
+    ids = parser.add_mutually_exclusive_group()
+    ids.add_argument('--vocabulary', metavar='FILE',
+                     help='print token IDs instead of tokens, given a vocabulary FILE with '
+                          'one token per line (the ID is its line number, counting from '
+                          'zero); unknown tokens get the next ID after the last one')
+    ids.add_argument('--hash-buckets', metavar='N', type=int,
+                     help='print token IDs instead of tokens by hashing them into N buckets')
     mode = parser.add_mutually_exclusive_group()
     parser.set_defaults(mode=TOKEN)
     mode.add_argument('--space', '-s', action='store_const', dest='mode', const=SPACE,
@@ -403,7 +745,38 @@ def main():
                       help=web_tokenizer.__doc__)
 
     args = parser.parse_args()
+
+    if args.resume and not args.output_dir:
+        parser.error('--resume requires --output-dir')
+
     tokenizer_func = TOKENIZER[args.mode]
+    encoding = args.encoding or 'utf-8'
+    inputs = corpus.expand_inputs(args.files)
+    manifest = corpus.Manifest(args.output_dir) if args.resume else None
+    stats = None
+    vocabulary = None
+    progress = None
+
+    if args.vocabulary:
+        from .vocabulary import Vocabulary
+        vocabulary = Vocabulary.load(args.vocabulary, args.encoding or 'utf-8')
+    elif args.hash_buckets:
+        from .vocabulary import HashingVocabulary
+        vocabulary = HashingVocabulary(args.hash_buckets)
+
+    if args.profile and args.mode in (TOKEN, WEB):
+        from .profiling import Stats
+        stats = Stats()
+
+    if args.progress is not None or args.stats_json:
+        from .profiling import Progress
+        total = sum(path.getsize(p) for p, _ in inputs if manifest is None or not manifest.finished(p))
+        progress = Progress(None if args.progress is None else stderr, total,
+                            PROGRESS_INTERVAL if args.progress is None else args.progress,
+                            timed=bool(args.stats_json))
+
+    if (stats is not None or args.budget is not None) and args.mode in (TOKEN, WEB):
+        tokenizer_func = lambda sentence, tokenize=tokenizer_func: tokenize(sentence, stats, args.budget)
 
     # fix broken Unicode handling in Python 2.x
     # see http://www.macfreek.nl/memory/Encoding_of_Python_stdout
@@ -426,14 +799,59 @@ def main():
     else:
         tokenizer = tokenizer_func
 
-    if args.files:
-        for txt_file_path in args.files:
-            with codecs.open(txt_file_path, 'r', encoding=(args.encoding or 'utf-8')) as fp:
-                for line in fp:
-                    _tokenize(line, tokenizer)
+    def tokenize_lines(lines, out):
+        # tokenize a batch of lines and write their output at once
+        output = []
+
+        for line in lines:
+            start = None if progress is None else progress.clock()
+            ids, sentence = _split_ids(line) if args.with_ids else ('', line)
+            tokens = _tokenize(sentence, tokenizer)
+            output.append(ids)
+            output.append(' '.join(tokens))
+            output.append(linesep)
+
+            if progress is not None:
+                progress.add(len(sentence), 1, len(tokens), start=start,
+                             doc_id=ids[:-1].replace('\t', ':') if ids else None)
+
+        out.write(''.join(output))
+        return len(lines)
+
+    def tokenize_batches(batches, out):
+        return sum(tokenize_lines(batch, out) for batch in batches)
+
+    if args.files and args.output_dir:
+        try:
+            corpus.write_shards(inputs, tokenize_batches, args.output_dir, encoding, args.readers,
+                                manifest, progress, corpus.BATCH_SIZE, args.shard_size)
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.files:
+        files = corpus.read_batches([p for p, _ in inputs], encoding, args.readers)
+
+        for _, batches in files if progress is None else progress.track(files):
+            tokenize_batches(batches, stdout)
+    elif args.output_dir:
+        key = (lambda line: _split_ids(line)[0]) if args.with_ids else None
+        corpus.write_stdin_shards(stdin, tokenize_lines, args.output_dir, encoding, args.shard_size,
+                                  manifest, key, corpus.BATCH_SIZE)
     else:
-        for line in stdin:
-            _tokenize(line, tokenizer)
+        for batch in corpus.batches(stdin):
+            tokenize_lines(batch, stdout)
+
+    if manifest is not None:
+        manifest.close()
+
+    if stats is not None:
+        stderr.write(stats.summary())
+        stderr.write(linesep)
+
+    if progress is not None:
+        progress.report(force=True)
+
+        if args.stats_json:
+            corpus.write_json(progress.summary(), args.stats_json)
 
 
 if __name__ == '__main__':
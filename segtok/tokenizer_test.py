@@ -4,7 +4,9 @@ import re
 from unittest import TestCase
 from segtok.tokenizer import space_tokenizer, symbol_tokenizer, word_tokenizer, web_tokenizer, IS_POSSESSIVE, \
     split_possessive_markers, IS_CONTRACTION, split_contractions
-from segtok.tokenizer import unescape
+from segtok.tokenizer import unescape, tokenize_parallel, iter_space_tokenizer, iter_symbol_tokenizer, \
+    iter_word_tokenizer, iter_web_tokenizer
+from segtok.profiling import Stats
 from . import span_utils
 
 __author__ = 'Florian Leitner <florian.leitner@gmail.com>'
@@ -314,6 +316,22 @@ class TestWordTokenizer(TestCase):
                   u"Not", u'\u2081']
         self.assertSequenceEqual(tokens, self.tokenizer(sentence))
 
+    def test_stats(self):
+        stats = Stats()
+        sentence = u"Hel- \n lo (hi), this ends here."
+        self.assertSequenceEqual(word_tokenizer(sentence), word_tokenizer(sentence, stats))
+        self.assertEqual(1, stats.counts['hyphenated linebreak'])
+        self.assertEqual(1, stats.counts['terminal: suffix'])
+        self.assertEqual(1, stats.counts['dangling punctuation'])
+        self.assertEqual(1, stats.calls['word split'])
+
+    def test_budget(self):
+        stats = Stats()
+        sentence = u"Hel- \n lo (hi), this ends here."
+        self.assertSequenceEqual(word_tokenizer(sentence), word_tokenizer(sentence, budget=10))
+        self.assertSequenceEqual(space_tokenizer(sentence), word_tokenizer(sentence, stats, budget=0))
+        self.assertEqual(1, stats.counts['budget exceeded: word_tokenizer'])
+
     def test_URLs(self):
         sentence = u"http://www.example.com/path/to.file?kwd=1&arg"
         tokens = [u'http', u'://', u'www.example.com', u'/', u'path',
@@ -332,6 +350,10 @@ class TestWebTokenizer(TestCase):
         tokens = sentence.split()
         self.assertEqual(tokens, self.tokenizer(sentence))
 
+    def test_no_URL_or_email(self):
+        sentence = u"caf&eacute; au lait"
+        self.assertEqual([("café", (0, 11)), ("au", (12, 14)), ("lait", (15, 19))], web_tokenizer(sentence))
+
     def test_URL_at_string_end(self):
         sentence = u"test this works https://file.server.com:8080/"
         tokens = sentence.split()
@@ -378,3 +400,54 @@ class TestWebTokenizer(TestCase):
             children ( P = 0.02 ; http://univ.edu.es/study.html ) [ 20-22 ] .
         """.split()
         self.assertEqual(tokens, self.tokenizer(sentence))
+
+    def test_entity_spans(self):
+        sentence = u"P&lt;0.05 &quot;hi&#x22; &copy; caf&eacute;"
+        tokens = [u'P', u'<', u'0.05', u'"', u'hi', u'"', u'\u00A9', u'caf\u00E9']
+        originals = [u'P', u'&lt;', u'0.05', u'&quot;', u'hi', u'&#x22;', u'&copy;', u'caf&eacute;']
+        tokens_with_spans = web_tokenizer(sentence)
+        self.assertEqual(tokens, [t for t, _ in tokens_with_spans])
+        self.assertEqual(originals, [sentence[s:e] for _, (s, e) in tokens_with_spans])
+
+    def test_stats(self):
+        stats = Stats()
+        sentence = u"Go to http://here.to/me &amp; stay."
+        self.assertSequenceEqual(web_tokenizer(sentence), web_tokenizer(sentence, stats))
+        self.assertEqual(1, stats.counts['uri or e-mail'])
+        self.assertEqual(1, stats.counts['unescape: changed'])
+        self.assertEqual(2, stats.calls['realign'])
+
+
+class TestTokenizeParallel(TestCase):
+
+    def test_order(self):
+        sentences = [u"Sentence number %d, at http://example.com/%d &amp; more." % (i, i) for i in range(50)]
+        expected = [web_tokenizer(s) for s in sentences]
+        self.assertEqual(expected, list(tokenize_parallel(iter(sentences), web_tokenizer, threads=3, chunk_size=4)))
+        self.assertEqual([word_tokenizer(s) for s in sentences[:3]], list(tokenize_parallel(sentences[:3])))
+
+    def test_shared_stats(self):
+        stats = Stats()
+        sentences = [u"Go to http://here.to/me &amp; stay."] * 20
+        list(tokenize_parallel(sentences, lambda s: web_tokenizer(s, stats), threads=4, chunk_size=1))
+        self.assertEqual(20, stats.counts['uri or e-mail'])
+        self.assertEqual(40, stats.calls['realign'])
+
+
+class TestIterTokenizers(TestCase):
+
+    SENTENCES = [u"Hel- \n lo Mr. Smith, see http://example.com &amp; more.", u"a,; b:, (.stuff",
+                 u"token (,; hi), issue", u"This is it...", u"", u"  "]
+
+    def test_identical(self):
+        for tokenizer, iter_tokenizer in ((space_tokenizer, iter_space_tokenizer),
+                                          (symbol_tokenizer, iter_symbol_tokenizer),
+                                          (word_tokenizer, iter_word_tokenizer),
+                                          (web_tokenizer, iter_web_tokenizer)):
+            for sentence in self.SENTENCES:
+                self.assertEqual(tokenizer(sentence), list(iter_tokenizer(sentence)), sentence)
+
+    def test_lazy(self):
+        tokens = iter_word_tokenizer(u"one, " * 1000 + u"end.")
+        self.assertEqual((u"one", (0, 3)), next(tokens))
+        self.assertEqual((u",", (3, 4)), next(tokens))
@@ -0,0 +1,149 @@
+"""
+A compact, columnar container for the tokens of a sentence.
+
+A list of ``(text, (start, end))`` tuples costs three tuples, two integers, and a string
+object per token. A :class:`TokenArray` instead keeps the token offsets in two contiguous integer
+arrays and slices each token's text from the source sentence only when it is accessed.
+Only tokens whose text differs from the source slice (e.g., re-joined hyphenated words or
+un-escaped HTML entities) keep their own string.
+
+All tokenizers return a token array instead of a list if called with ``as_array=True``::
+
+    >>> tokens = word_tokenizer("This is a sentence.", as_array=True)
+    >>> tokens[3], len(tokens)
+    (('sentence', (10, 18)), 5)
+    >>> starts, ends = tokens.to_numpy()
+
+Token arrays can also hold integer token IDs (see :mod:`segtok.vocabulary`) in a third array.
+"""
+from __future__ import absolute_import, unicode_literals
+from array import array
+from .vocabulary import ID_TYPE
+
+
+__author__ = 'Florian Leitner <florian.leitner@gmail.com>'
+
+OFFSET_TYPE = 'l'
+"The array type code used to store token offsets."
+
+
+class TokenArray(object):
+    """
+    A read-only sequence of ``(text, (start, end))`` tokens of a `source` sentence.
+
+    The token offsets are stored in the `starts` and `ends` arrays, and the `overrides` map
+    token indices to the texts of tokens that differ from their slice of the source.
+    The `ids` array of token IDs is None until the tokens are encoded.
+    """
+
+    __slots__ = ('source', 'starts', 'ends', 'overrides', 'ids')
+
+    def __init__(self, source, starts=None, ends=None, overrides=None, ids=None):
+        self.source = source
+        self.starts = array(OFFSET_TYPE) if starts is None else starts
+        self.ends = array(OFFSET_TYPE) if ends is None else ends
+        self.overrides = {} if overrides is None else overrides
+        self.ids = ids
+
+    @classmethod
+    def from_tokens(cls, source, tokens_with_spans, vocabulary=None):
+        """
+        Create a token array from the ``(text, (start, end))`` tokens of the `source`,
+        encoding their IDs in the same pass if a `vocabulary` is given.
+        """
+        tokens = cls(source)
+        starts, ends, overrides = tokens.starts, tokens.ends, tokens.overrides
+
+        if vocabulary is not None:
+            tokens.ids = array(ID_TYPE)
+            append_id, token_id = tokens.ids.append, vocabulary.token_id
+
+        for idx, (text, (start, end)) in enumerate(tokens_with_spans):
+            starts.append(start)
+            ends.append(end)
+
+            if text != source[start:end]:
+                overrides[idx] = text
+
+            if vocabulary is not None:
+                append_id(token_id(text))
+
+        return tokens
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            indices = range(*idx.indices(len(self)))
+            overrides = dict((new, self.overrides[old]) for new, old in enumerate(indices)
+                             if old in self.overrides)
+            ids = None if self.ids is None else self.ids[idx]
+            return TokenArray(self.source, self.starts[idx], self.ends[idx], overrides, ids)
+
+        if idx < 0:
+            idx += len(self)
+
+        if not 0 <= idx < len(self):
+            raise IndexError('token index out of range')
+
+        return self.text(idx), (self.starts[idx], self.ends[idx])
+
+    def __iter__(self):
+        source, overrides = self.source, self.overrides
+
+        for idx, (start, end) in enumerate(zip(self.starts, self.ends)):
+            yield overrides[idx] if idx in overrides else source[start:end], (start, end)
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'TokenArray(%r)' % list(self)
+
+    def text(self, idx):
+        """The text of the token at index `idx`."""
+        if idx in self.overrides:
+            return self.overrides[idx]
+
+        return self.source[self.starts[idx]:self.ends[idx]]
+
+    def span(self, idx):
+        """The ``(start, end)`` offsets of the token at index `idx`."""
+        return self.starts[idx], self.ends[idx]
+
+    def texts(self):
+        """A list of all token texts."""
+        return [text for text, _ in self]
+
+    def encode(self, vocabulary):
+        """
+        Set (and return) the `ids` array of the tokens as encoded by the `vocabulary`
+        (see :mod:`segtok.vocabulary`).
+        """
+        self.ids = vocabulary.encode(text for text, _ in self)
+        return self.ids
+
+    def to_numpy(self, columns=('starts', 'ends')):
+        """
+        A tuple of NumPy arrays of the named `columns` (any of ``starts``, ``ends``, and ``ids``)
+        that share their memory with this token array.
+
+        Requires NumPy to be installed.
+        """
+        import numpy
+        arrays = [getattr(self, name) for name in columns]
+
+        if any(a is None for a in arrays):
+            raise ValueError('the tokens have not been encoded')
+
+        return tuple(numpy.frombuffer(a, a.typecode) for a in arrays)
@@ -0,0 +1,62 @@
+# coding=utf-8
+from __future__ import absolute_import, division, unicode_literals
+from unittest import TestCase
+from segtok.tokenizer import space_tokenizer, symbol_tokenizer, word_tokenizer, web_tokenizer, \
+    split_contractions, split_possessive_markers
+from segtok.vocabulary import HashingVocabulary
+from segtok.tokens import TokenArray
+
+SENTENCE = "Hel- \n lo Mr. Smith, see http://example.com &amp; more."
+
+
+class TestTokenArray(TestCase):
+
+    def test_tokenizers(self):
+        for tokenizer in (space_tokenizer, symbol_tokenizer, word_tokenizer, web_tokenizer):
+            tokens = tokenizer(SENTENCE)
+            array = tokenizer(SENTENCE, as_array=True)
+            self.assertIsInstance(array, TokenArray)
+            self.assertEqual(tokens, list(array))
+            self.assertEqual(array, tokens)
+            self.assertEqual(len(tokens), len(array))
+            self.assertEqual(tokens[-1], array[-1])
+
+    def test_overrides(self):
+        tokens = word_tokenizer(SENTENCE, as_array=True)
+        self.assertEqual(('Hel-lo', (0, 9)), tokens[0])
+        self.assertEqual({0: 'Hel-lo'}, tokens.overrides)
+        self.assertEqual('Mr.', tokens.text(1))
+        self.assertEqual((10, 13), tokens.span(1))
+
+    def test_index_range(self):
+        tokens = word_tokenizer("a b c", as_array=True)
+        self.assertEqual(('b', (2, 3)), tokens[-2])
+        self.assertRaises(IndexError, tokens.__getitem__, -4)
+        self.assertRaises(IndexError, tokens.__getitem__, 3)
+
+    def test_slice(self):
+        tokens = word_tokenizer(SENTENCE, as_array=True)
+        self.assertEqual(word_tokenizer(SENTENCE)[:3], tokens[:3])
+        self.assertEqual(word_tokenizer(SENTENCE)[1:], list(tokens[1:]))
+        self.assertEqual({}, tokens[1:].overrides)
+
+    def test_split(self):
+        sentence = "Fred's friends don't know the boss' name."
+
+        for split in (split_contractions, split_possessive_markers):
+            tokens = split(word_tokenizer(sentence, as_array=True))
+            self.assertIsInstance(tokens, TokenArray)
+            self.assertEqual(split(word_tokenizer(sentence)), list(tokens))
+
+        encoded = word_tokenizer(sentence, vocabulary=HashingVocabulary(16))
+        self.assertRaises(ValueError, split_contractions, encoded)
+
+    def test_to_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('NumPy is not installed')
+
+        starts, ends = word_tokenizer(SENTENCE, as_array=True).to_numpy()
+        self.assertEqual([0, 10], list(starts[:2]))
+        self.assertEqual([9, 13], list(ends[:2]))
@@ -0,0 +1,82 @@
+"""
+Integer token IDs for machine learning pipelines.
+
+A :class:`Vocabulary` maps the tokens of a prebuilt vocabulary to their IDs and all other
+tokens to an out-of-vocabulary (OOV) ID, while a :class:`HashingVocabulary` maps any token to
+one of a fixed number of buckets by hashing (the "hashing trick").
+Pass either as the ``vocabulary`` argument to a tokenizer to get a
+:class:`segtok.tokens.TokenArray` with an integer ID array next to the offset arrays::
+
+    >>> tokens = word_tokenizer("This is a sentence.", vocabulary=HashingVocabulary(1 << 18))
+    >>> ids, starts, ends = tokens.to_numpy(('ids', 'starts', 'ends'))
+"""
+from __future__ import absolute_import, unicode_literals
+from array import array
+import io
+from zlib import crc32
+
+
+__author__ = 'Florian Leitner <florian.leitner@gmail.com>'
+
+ID_TYPE = 'l'
+"The array type code used to store token IDs."
+
+
+class Vocabulary(object):
+    """
+    Map tokens to the `ids` of a prebuilt vocabulary (a dictionary), and any other token to the
+    `oov` ID (by default, one more than the largest ID).
+    """
+
+    __slots__ = ('ids', 'oov')
+
+    def __init__(self, ids, oov=None):
+        self.ids = ids
+        self.oov = (max(ids.values()) + 1 if ids else 0) if oov is None else oov
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, path, encoding='utf-8', oov=None):
+        """
+        Load a vocabulary file with one token per line (optionally followed by a tab and any
+        other columns, like counts); the ID of each token is its (zero-based) line number.
+        """
+        ids = {}
+
+        with io.open(path, 'r', encoding=encoding, newline='\n') as stream:
+            for idx, line in enumerate(stream):
+                ids.setdefault(line.rstrip('\r\n').split('\t', 1)[0], idx)
+
+        return cls(ids, oov)
+
+    def token_id(self, text):
+        """The ID of the token `text`."""
+        return self.ids.get(text, self.oov)
+
+    def encode(self, texts):
+        """An array of the IDs of the token `texts`."""
+        get, oov = self.ids.get, self.oov
+        return array(ID_TYPE, [get(text, oov) for text in texts])
+
+
+class HashingVocabulary(object):
+    """Map tokens to one of `size` buckets by the CRC-32 hash of their UTF-8 encoding."""
+
+    __slots__ = ('size',)
+
+    def __init__(self, size):
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def token_id(self, text):
+        """The bucket ID of the token `text`."""
+        return (crc32(text.encode('utf-8')) & 0xffffffff) % self.size
+
+    def encode(self, texts):
+        """An array of the bucket IDs of the token `texts`."""
+        size = self.size
+        return array(ID_TYPE, [(crc32(text.encode('utf-8')) & 0xffffffff) % size for text in texts])
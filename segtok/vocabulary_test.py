@@ -0,0 +1,51 @@
+# coding=utf-8
+from __future__ import absolute_import, division, unicode_literals
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from segtok.tokenizer import word_tokenizer, web_tokenizer
+from segtok.vocabulary import Vocabulary, HashingVocabulary
+
+SENTENCE = "This is a caf&eacute; test."
+
+
+class TestVocabulary(TestCase):
+
+    def test_encode(self):
+        vocabulary = Vocabulary({'This': 0, 'is': 1, '.': 2})
+        tokens = word_tokenizer(SENTENCE, vocabulary=vocabulary)
+        self.assertEqual([0, 1, 3, 3, 3, 3, 3, 3, 2], list(tokens.ids))
+        self.assertEqual(word_tokenizer(SENTENCE), list(tokens))
+
+    def test_load(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'vocabulary.txt')
+
+        try:
+            with io.open(path, 'w', encoding='utf-8') as stream:
+                stream.write('café\t12\nThis\t10\n')
+
+            vocabulary = Vocabulary.load(path)
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual(2, vocabulary.oov)
+        self.assertEqual([1, 2, 2, 0, 2, 2], list(web_tokenizer(SENTENCE, vocabulary=vocabulary).ids))
+
+
+class TestHashingVocabulary(TestCase):
+
+    def test_encode(self):
+        tokens = word_tokenizer(SENTENCE + " This", vocabulary=HashingVocabulary(16))
+        self.assertEqual(len(tokens), len(tokens.ids))
+        self.assertTrue(all(0 <= i < 16 for i in tokens.ids))
+        self.assertEqual(tokens.ids[0], tokens.ids[-1])
+        self.assertEqual(tokens.ids[:3], tokens[:3].ids)
+
+    def test_token_id(self):
+        vocabulary = HashingVocabulary(16)
+        tokens = word_tokenizer(SENTENCE, vocabulary=vocabulary)
+        self.assertEqual(vocabulary.encode(tokens.texts()), tokens.ids)
+        self.assertEqual([vocabulary.token_id(text) for text in tokens.texts()], list(tokens.ids))